@@ -0,0 +1,72 @@
+"""Measures the import cost of the entry-point modules and checks gui.py stays lazy.
+
+    python benchmarks/bench_import_time.py                 # gui, scraper, transaction_scraper, daemon
+    python benchmarks/bench_import_time.py gui --top 15    # heaviest imports of one module
+    python benchmarks/bench_import_time.py --budget 500    # fail if `import gui` takes longer (ms)
+
+Each module is imported in a fresh interpreter with `python -X importtime`. Importing gui
+must not load any of HEAVY_MODULES; those belong to the worker threads.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "plotly", "bs4", "matplotlib", "tzlocal", "requests"]
+
+
+def import_times(module):
+    """Returns (total_us, [(cumulative_us, name)]) for `import module` in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # Nesting is shown by indentation; only top-level entries add up to the total
+        entries.append((int(cumulative), name.rstrip(), not name[1:].startswith(" ")))
+    total = sum(cumulative for cumulative, _, top_level in entries if top_level)
+    return total, [(cumulative, name.strip()) for cumulative, name, _ in entries]
+
+
+def loaded_heavy_modules(module):
+    code = (f"import sys; import {module}; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["gui", "scraper", "transaction_scraper", "daemon"])
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module (best is reported)")
+    parser.add_argument("--budget", type=float, default=None, help="Maximum import time of gui in ms")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        total, entries = min(runs)
+        print(f"{module:<20} {total / 1000:8.1f} ms")
+        for cumulative, name in sorted(entries, reverse=True)[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+        if module == "gui":
+            heavy = loaded_heavy_modules(module)
+            if heavy:
+                failures.append(f"import gui loads {', '.join(heavy)}")
+            if args.budget is not None and total / 1000 > args.budget:
+                failures.append(f"import gui took {total / 1000:.1f} ms (budget {args.budget:.0f} ms)")
+
+    if failures:
+        sys.exit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compares the BeautifulSoup and streaming parsers on gw2bltc result pages.
+
+    python benchmarks/bench_parser.py                  # synthetic 200-row pages
+    python benchmarks/bench_parser.py saved/*.html     # pages saved from the site
+
+Every page is parsed by both backends and the item_data dicts must be identical.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import parse_page  # noqa: E402
+from fixtures import search_page  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="Saved result pages (HTML files)")
+    parser.add_argument("--rows", type=int, default=200, help="Rows per synthetic page")
+    parser.add_argument("--count", type=int, default=5, help="Number of synthetic pages")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    if args.pages:
+        docs = []
+        for path in args.pages:
+            with open(path, encoding="utf-8") as f:
+                docs.append((os.path.basename(path), f.read()))
+    else:
+        docs = [(f"synthetic-{i}", search_page(args.rows, seed=i)) for i in range(args.count)]
+
+    totals = {"soup": 0.0, "fast": 0.0}
+    rows = 0
+    for name, html in docs:
+        soup_items = parse_page(html, "soup")
+        fast_items = parse_page(html, "fast")
+        if soup_items != fast_items:
+            sys.exit(f"{name}: parsers disagree ({len(soup_items)} vs {len(fast_items)} items)")
+        rows += len(soup_items)
+        for backend in totals:
+            totals[backend] += best_of(lambda: parse_page(html, backend), args.repeat)
+
+    print(f"{len(docs)} pages, {rows} rows, identical output")
+    for backend, elapsed in totals.items():
+        print(f"{backend:>5}: {elapsed * 1000:8.1f} ms  {rows / elapsed:10.0f} rows/s")
+    print(f"speedup: {totals['soup'] / totals['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
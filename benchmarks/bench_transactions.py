@@ -0,0 +1,66 @@
+"""Benchmarks the list-based and vectorized transaction filter/aggregate paths.
+
+    python benchmarks/bench_transactions.py            # 100k buys + 100k sells
+    python benchmarks/bench_transactions.py --size 20000
+
+Both paths must produce the same aggregates (to within float rounding).
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transaction_scraper import (  # noqa: E402
+    aggregate_transactions, aggregate_transactions_df, filter_last_n_days, filter_last_n_days_df,
+)
+from fixtures import transactions  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="Transactions per side")
+    parser.add_argument("--days", type=int, default=30, help="Report window")
+    args = parser.parse_args()
+
+    buys = transactions(args.size, seed=1)
+    sells = transactions(args.size, seed=2)
+    quiet = lambda msg: None  # noqa: E731
+
+    def list_path():
+        b = filter_last_n_days(buys, quiet, n=args.days)
+        s = filter_last_n_days(sells, quiet, n=args.days)
+        return aggregate_transactions(b, s)
+
+    def frame_path():
+        b = filter_last_n_days_df(buys, quiet, n=args.days)
+        s = filter_last_n_days_df(sells, quiet, n=args.days)
+        return aggregate_transactions_df(b, s)
+
+    expected, list_time = timed(list_path)
+    actual, frame_time = timed(frame_path)
+
+    if expected.keys() != actual.keys():
+        sys.exit("aggregates differ: item sets do not match")
+    for iid, row in expected.items():
+        for key, value in row.items():
+            if not math.isclose(value, actual[iid][key], rel_tol=1e-9, abs_tol=1e-6):
+                sys.exit(f"aggregates differ for item {iid} {key}: {value} vs {actual[iid][key]}")
+
+    total = 2 * args.size
+    print(f"{total} transactions, {len(expected)} items, identical aggregates")
+    print(f"  list: {list_time * 1000:8.1f} ms  {total / list_time:10.0f} tx/s")
+    print(f" frame: {frame_time * 1000:8.1f} ms  {total / frame_time:10.0f} tx/s")
+    print(f"speedup: {list_time / frame_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Behaviour checks for the stateful paths, on small hand-written inputs.
+
+    python benchmarks/checks.py                 # every check
+    python benchmarks/checks.py coverage tail   # only the named checks
+
+HTTP traffic goes to a local FixtureServer, like the benchmark suite. Exits 1 if a check fails.
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import traceback
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper  # noqa: E402
+import transaction_scraper  # noqa: E402
+from cost_basis import match_lots  # noqa: E402
+from fixture_server import TRANSACTIONS_PATH, FixtureServer, FixtureSet  # noqa: E402
+from fixtures import datawars_history, transactions  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+from ledger import API_HISTORY_DAYS, TransactionLedger  # noqa: E402
+from suite import point_clients_at, quiet  # noqa: E402
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def hours(n):
+    return T0 + timedelta(hours=n)
+
+
+def check_coverage(tmp, server):
+    """Fetched ranges merge when they touch or overlap and replace the coverage when they leave a gap."""
+    store = HistoryStore(os.path.join(tmp, "coverage.sqlite"))
+    try:
+        store.mark_fetched(["1", "2"], hours(0), hours(10))
+        store.mark_fetched(["1"], hours(10), hours(15))  # touching: extends
+        store.mark_fetched(["1"], hours(5), hours(8))  # inside: unchanged
+        store.mark_fetched(["2"], hours(-5), hours(2))  # overlapping the start: extends backwards
+        assert store.coverage(["1", "2"]) == {"1": (hours(0), hours(15)), "2": (hours(-5), hours(10))}
+        store.mark_fetched(["1"], hours(20), hours(25))  # gap: hours 15..20 were never fetched
+        assert store.coverage(["1"]) == {"1": (hours(20), hours(25))}
+        assert store.coverage(["3"]) == {}
+    finally:
+        store.close()
+
+
+def check_tail(tmp, server):
+    """The hour in progress at the previous fetch is fetched again, so its final sample is stored."""
+    now = datetime.now(timezone.utc)
+    last_hour = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+    history = datawars_history("1", now - timedelta(days=8), now)
+    server.fixtures = FixtureSet([], [], [], history=history)
+    store = HistoryStore(os.path.join(tmp, "tail.sqlite"))
+    try:
+        # The previous run fetched at hh:34, before the sample of `last_hour` was published
+        store.add([r for r in history if datetime.fromisoformat(r["date"].replace("Z", "+00:00")) < last_hour])
+        store.mark_fetched(["1"], now - timedelta(days=8), last_hour + timedelta(minutes=34))
+        result = scraper.get_datawars_data(["1"], quiet, days=7, store=store)
+        dates = {r["date"] for r in store.load(["1"], now - timedelta(days=7))}
+        assert last_hour.strftime("%Y-%m-%dT%H:%M:%S.000Z") in dates, "the previous run's last hour is missing"
+        assert result["1"]["Bought"] == scraper.get_datawars_data(["1"], quiet, days=7)["1"]["Bought"]
+    finally:
+        store.close()
+
+
+def check_failed_probe(tmp, server):
+    """A failed last-page probe does not cut the concurrent crawl short."""
+    server.fixtures = FixtureSet.synthetic(6, rows_per_page=5)
+    fetch_page, failed = scraper.fetch_page, []
+
+    def flaky_fetch_page(page, *args, **kwargs):
+        if page == 4 and not failed:  # the first request for page 4 fails
+            failed.append(page)
+            return None
+        return fetch_page(page, *args, **kwargs)
+
+    scraper.fetch_page = flaky_fetch_page
+    try:
+        crawled = list(scraper.crawl_pages(0, quiet, workers=4))
+    finally:
+        scraper.fetch_page = fetch_page
+    assert failed and len(crawled) == 6, f"crawled {len(crawled)} of 6 pages"
+
+
+def tx(tx_id, when, item_id=1, price=100, quantity=1):
+    """One transaction in the API's shape, purchased at `when`."""
+    stamp = when.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    return {"id": tx_id, "item_id": item_id, "price": price, "quantity": quantity, "created": stamp, "purchased": stamp}
+
+
+def check_failed_sync(tmp, server):
+    """A sync that fails before storing anything keeps the watermark, so the next one stays incremental."""
+    now = datetime.now(timezone.utc)
+    watermark = now - timedelta(days=30)
+    ledger = TransactionLedger(os.path.join(tmp, "failed-sync.sqlite"))
+    try:
+        ledger.add("buys", [tx(1, now - timedelta(days=2))])
+        ledger.set_watermark("buys", watermark)
+        transaction_scraper.TRANSACTIONS_URL = server.base_url + "/v2/commerce/unavailable"  # every page is a 404
+        for engine in ("async", "serial"):
+            assert transaction_scraper.sync_ledger_side(ledger, "buys", "key", quiet, engine=engine) == 0
+            assert ledger.watermark("buys") == watermark, engine
+    finally:
+        transaction_scraper.TRANSACTIONS_URL = server.base_url + TRANSACTIONS_PATH
+        ledger.close()
+
+
+def ids(txs):
+    return {t["id"] for t in txs}
+
+
+def check_ledger_sync(tmp, server):
+    """Backfill on a new ledger, then incremental syncs that stop at the synced part, for both engines."""
+    history = transactions(450, seed=3, days=60)
+    for engine in ("async", "serial"):
+        server.fixtures = FixtureSet([], history[50:], [])
+        ledger = TransactionLedger(os.path.join(tmp, f"sync-{engine}.sqlite"))
+        try:
+            # New ledger: the whole API history, and a watermark at the API's horizon
+            assert transaction_scraper.sync_ledger_side(ledger, "buys", "key", quiet, engine=engine) == 400
+            horizon = datetime.now(timezone.utc) - timedelta(days=API_HISTORY_DAYS)
+            assert abs((ledger.watermark("buys") - horizon).total_seconds()) < 60
+            watermark = ledger.watermark("buys")
+
+            # 50 newer transactions: the walk stops at page 1, the first one made up only of known ids
+            server.fixtures = FixtureSet([], history, [])
+            pages, fetch_page = [], transaction_scraper.fetch_transaction_page
+            transaction_scraper.fetch_transaction_page = lambda endpoint, page, *a: pages.append(page) or fetch_page(
+                endpoint, page, *a)
+            try:
+                assert transaction_scraper.sync_ledger_side(ledger, "buys", "key", quiet, engine=engine) == 50
+            finally:
+                transaction_scraper.fetch_transaction_page = fetch_page
+            assert pages == [0, 1], pages
+            assert ledger.watermark("buys") == watermark
+            assert ids(ledger.load("buys")) == ids(history)
+        finally:
+            ledger.close()
+
+
+def check_ledger_backfill(tmp, server):
+    """A `since` before a recent watermark backfills the gap; an interrupted sync forces a backfill."""
+    now = datetime.now(timezone.utc)
+    history = transactions(1000, seed=4, days=60)
+    recent = [t for t in history if t["purchased"] >= (now - timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%S+00:00")]
+    server.fixtures = FixtureSet([], history, [])
+    ledger = TransactionLedger(os.path.join(tmp, "backfill.sqlite"))
+    try:
+        # Synced only the last 30 days (more than a page) so far: asking for 60 days must fetch what lies before
+        ledger.add("buys", recent)
+        ledger.set_watermark("buys", now - timedelta(days=30))
+        added = transaction_scraper.sync_ledger_side(ledger, "buys", "key", quiet, since=now - timedelta(days=60))
+        assert added == len(history) - len(recent), added
+        assert ids(ledger.load("buys")) == ids(history)
+
+        # A sync that stores page 0 and then fails leaves a hole below it: no watermark ...
+        newer = transactions(250, seed=5, days=0)
+        for t in newer:
+            t["id"] += 1000  # newer than every id in `history`
+        server.fixtures = FixtureSet([], newer + history, [])
+        fetch_page = transaction_scraper.fetch_transaction_page
+
+        def failing_fetch_page(endpoint, page, *args):
+            if page > 0:
+                raise transaction_scraper.requests.exceptions.ConnectionError("connection reset")
+            return fetch_page(endpoint, page, *args)
+
+        transaction_scraper.fetch_transaction_page = failing_fetch_page
+        try:
+            assert transaction_scraper.sync_ledger_side(ledger, "buys", "key", quiet, engine="serial") == 200
+        finally:
+            transaction_scraper.fetch_transaction_page = fetch_page
+        assert ledger.watermark("buys") is None
+        # ... so the next sync backfills and closes it
+        assert transaction_scraper.sync_ledger_side(ledger, "buys", "key", quiet, engine="serial") == 50
+        assert ids(ledger.load("buys")) == ids(newer + history)
+        assert ledger.watermark("buys") is not None
+    finally:
+        ledger.close()
+
+
+def check_lots(tmp, server):
+    """FIFO matching across partial fills, buys before sells on equal times, and `since` cut-offs."""
+    buys = [tx(1, hours(0), item_id=1, price=100, quantity=10), tx(2, hours(1), item_id=1, price=200, quantity=5),
+            tx(3, hours(0), item_id=2, price=50, quantity=4), tx(4, hours(0), item_id=3, price=10, quantity=5)]
+    sells = [tx(5, hours(2), item_id=1, price=300, quantity=12),  # all of lot 1 and 2 of lot 2
+             tx(6, hours(0), item_id=2, price=100, quantity=4),  # same time as its buy
+             tx(7, hours(3), item_id=2, price=100, quantity=3),  # nothing left to match
+             tx(8, hours(1), item_id=3, price=20, quantity=3), tx(9, hours(3), item_id=3, price=20, quantity=4)]
+
+    items, daily = match_lots(buys, sells, fee_multiplier=0.85, now=hours(5))
+    one, two, three = items[1], items[2], items[3]
+    assert (one["matched_qty"], one["cost"], one["unmatched_qty"]) == (12, 1400, 0)
+    assert math.isclose(one["proceeds"], 3060) and math.isclose(one["profit"], 1660)
+    assert math.isclose(one["avg_hold_hours"], (10 * 2 + 2 * 1) / 12)
+    assert (one["open_qty"], one["open_cost"]) == (3, 600) and math.isclose(one["open_age_hours"], 4)
+    assert (two["matched_qty"], two["cost"], two["unmatched_qty"], two["open_qty"]) == (4, 200, 3, 0)
+    assert (three["matched_qty"], three["cost"], three["unmatched_qty"]) == (5, 50, 2)
+    assert list(daily) == ["2025-01-01"] and math.isclose(daily["2025-01-01"], 1660 + 140 + 35)
+
+    # Sells before `since` are not realized but still consume their lots
+    items, daily = match_lots(buys, sells, since=hours(2), fee_multiplier=0.85, now=hours(5))
+    assert (items[2]["matched_qty"], items[2]["unmatched_qty"]) == (0, 3)
+    assert (items[3]["matched_qty"], items[3]["cost"], items[3]["unmatched_qty"]) == (2, 20, 2)
+    assert math.isclose(daily["2025-01-01"], 1660 + 14)
+
+
+CHECKS = {
+    "coverage": check_coverage,
+    "tail": check_tail,
+    "failed_probe": check_failed_probe,
+    "failed_sync": check_failed_sync,
+    "ledger_sync": check_ledger_sync,
+    "ledger_backfill": check_ledger_backfill,
+    "lots": check_lots,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("checks", nargs="*", help=f"Checks to run (default: all of {', '.join(CHECKS)})")
+    args = parser.parse_args()
+    unknown = set(args.checks) - set(CHECKS)
+    if unknown:
+        parser.error(f"unknown checks: {', '.join(sorted(unknown))}")
+
+    failed = 0
+    with FixtureServer(FixtureSet([], [], [])) as server, tempfile.TemporaryDirectory() as tmp:
+        point_clients_at(server.base_url)
+        for name in args.checks or CHECKS:
+            try:
+                CHECKS[name](tmp, server)
+            except Exception:
+                failed += 1
+                print(f"FAIL {name}")
+                traceback.print_exc()
+            else:
+                print(f"ok   {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""A local stand-in for gw2bltc, DataWars2 and the GW2 API that serves benchmark fixtures.
+
+A FixtureSet holds the responses: search result pages, buy/sell transactions and,
+optionally, recorded DataWars2 history, /v2/items and /v2/commerce/prices payloads
+(synthesized per item otherwise; synthetic sets list `universe` tradable ids). Order books
+(/v2/commerce/listings) are always synthesized. Sets can be saved to and loaded from a directory, so responses captured from
+the real services can be replayed:
+
+    <dir>/search-page-001.html ...   gw2bltc result pages, in order
+    <dir>/buys.json, sells.json      transaction history, newest first
+    <dir>/history.json               optional DataWars2 records
+    <dir>/items.json                 optional /v2/items entries
+    <dir>/prices.json                optional /v2/commerce/prices entries
+"""
+import glob
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from fixtures import datawars_history, item_payload, listings_payload, price_payload, search_page, transactions
+
+HISTORY_PATH = "/gw2/v2/history/json"
+SEARCH_PATH = "/en/tp/search"
+TRANSACTIONS_PATH = "/v2/commerce/transactions/history"
+ITEMS_PATH = "/v2/items"
+PRICES_PATH = "/v2/commerce/prices"
+LISTINGS_PATH = "/v2/commerce/listings"
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+class FixtureSet:
+    def __init__(self, pages, buys, sells, history=None, items=None, prices=None, universe=0):
+        self.pages = [page.encode() for page in pages]
+        self.buys = buys
+        self.sells = sells
+        self.history = {}
+        for record in history or []:
+            self.history.setdefault(str(record["itemID"]), []).append(record)
+        self.items = {item["id"]: item for item in items or []}
+        self.prices = {price["id"]: price for price in prices or []}
+        self.universe = universe
+        self._synthetic_history = {}
+        self.empty_page = search_page(0).encode()
+
+    @classmethod
+    def synthetic(cls, pages, rows_per_page=200, transactions_per_side=0, items=2000, universe=0):
+        return cls(
+            [search_page(rows_per_page, seed=p, first_item_id=10000 + (p - 1) * rows_per_page)
+             for p in range(1, pages + 1)],
+            transactions(transactions_per_side, seed=1, items=items),
+            transactions(transactions_per_side, seed=2, items=items),
+            universe=universe,
+        )
+
+    @classmethod
+    def load(cls, path):
+        pages = []
+        for page_path in sorted(glob.glob(os.path.join(path, "search-page-*.html"))):
+            with open(page_path, encoding="utf-8") as f:
+                pages.append(f.read())
+
+        def load_json(name):
+            full = os.path.join(path, name)
+            if not os.path.exists(full):
+                return None
+            with open(full, encoding="utf-8") as f:
+                return json.load(f)
+
+        return cls(pages, load_json("buys.json") or [], load_json("sells.json") or [],
+                   load_json("history.json"), load_json("items.json"), load_json("prices.json"))
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for p, page in enumerate(self.pages, start=1):
+            with open(os.path.join(path, f"search-page-{p:03d}.html"), "wb") as f:
+                f.write(page)
+        for name, data in (("buys.json", self.buys), ("sells.json", self.sells)):
+            with open(os.path.join(path, name), "w", encoding="utf-8") as f:
+                json.dump(data, f)
+
+    def history_for(self, item_id, start, end):
+        if item_id in self.history:
+            return [r for r in self.history[item_id] if start <= _parse_time(r["date"]) <= end]
+        # Synthesized series are cached by hour so repeated runs don't time the generator
+        key = (item_id, start.replace(minute=0, second=0, microsecond=0), end.replace(minute=0, second=0, microsecond=0))
+        if key not in self._synthetic_history:
+            self._synthetic_history[key] = datawars_history(item_id, start, end)
+        return self._synthetic_history[key]
+
+    def item(self, item_id):
+        return self.items.get(item_id) or item_payload(item_id)
+
+    def price_ids(self):
+        return sorted(self.prices) if self.prices else list(range(1, self.universe + 1))
+
+    def price(self, item_id):
+        if self.prices:
+            return self.prices.get(item_id)
+        return price_payload(item_id) if 1 <= item_id <= self.universe else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+
+    def _send(self, code, body, content_type="application/json", headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        fixtures = self.server.fixtures
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == SEARCH_PATH:
+            page = int(query.get("page", 1))
+            body = fixtures.pages[page - 1] if 1 <= page <= len(fixtures.pages) else fixtures.empty_page
+            self._send(200, body, "text/html; charset=utf-8")
+        elif url.path == HISTORY_PATH:
+            start, end = _parse_time(query["start"]), _parse_time(query["end"])
+            records = []
+            for item_id in query["itemID"].split(","):
+                records.extend(fixtures.history_for(item_id, start, end))
+            self._send(200, records)
+        elif url.path.startswith(TRANSACTIONS_PATH + "/"):
+            side = fixtures.buys if url.path.endswith("/buys") else fixtures.sells
+            page, size = int(query.get("page", 0)), int(query.get("page_size", 50))
+            page_total = max(1, -(-len(side) // size))
+            if page >= page_total:
+                self._send(400, {"text": "page out of range. Use page values 0 - %d." % (page_total - 1)})
+                return
+            self._send(200, side[page * size:(page + 1) * size],
+                       headers={"X-Page-Total": str(page_total), "X-Result-Total": str(len(side))})
+        elif url.path == PRICES_PATH:
+            if "ids" not in query:
+                self._send(200, fixtures.price_ids())
+                return
+            prices = [p for p in (fixtures.price(int(i)) for i in query["ids"].split(",") if i) if p]
+            if prices:
+                self._send(200, prices)
+            else:
+                self._send(404, {"text": "all ids provided are invalid"})
+        elif url.path == LISTINGS_PATH:
+            listings = [listings_payload(int(i)) for i in query.get("ids", "").split(",") if i]
+            self._send(200 if listings else 404, listings or {"text": "all ids provided are invalid"})
+        elif url.path == ITEMS_PATH:
+            self._send(200, [fixtures.item(int(i)) for i in query.get("ids", "").split(",") if i])
+        else:
+            self._send(404, {"text": "not found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serves a FixtureSet on 127.0.0.1 from a background thread; use as a context manager."""
+
+    def __init__(self, fixtures):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fixtures = fixtures
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def fixtures(self):
+        return self.httpd.fixtures
+
+    @fixtures.setter
+    def fixtures(self, fixtures):
+        self.httpd.fixtures = fixtures
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,142 @@
+"""Synthetic fixtures shaped like the gw2bltc, DataWars2 and GW2 API responses."""
+import random
+from datetime import datetime, timedelta, timezone
+
+_NAMES = ["Mithril Ingot", "Glob of Ectoplasm", "Pile of Crystalline Dust", "Vial of Powerful Blood",
+          "Elder Wood Plank", "Orichalcum Ore", "Superior Rune of the Scholar", "Mystic Coin"]
+
+
+def _coins(gold, silver, copper):
+    parts = []
+    if gold:
+        parts.append(f'<span class="cur-t1c">{gold:,}</span>')
+    parts.append(f'<span class="cur-t1b">{silver}</span>')
+    parts.append(f'<span class="cur-t1a">{copper}</span>')
+    return " ".join(parts)
+
+
+def _result_row(item_id, rnd):
+    name = f"{rnd.choice(_NAMES)} &amp; Co. #{item_id}"
+    slug = name.replace(" ", "-").replace("&amp;", "and")
+    sell = (rnd.randint(0, 1500), rnd.randint(0, 99), rnd.randint(0, 99))
+    buy = (rnd.randint(0, 1500), rnd.randint(0, 99), rnd.randint(0, 99))
+    counts = [f"{rnd.randint(0, 250_000):,}" for _ in range(6)]
+    return (
+        "<tr>"
+        f'<td class="td-icon"><img src="https://render.guildwars2.com/file/{item_id}.png" alt=""></td>'
+        f'<td class="td-name"><a href="/en/item/{item_id}-{slug}" class="rarity-rare">{name}</a></td>'
+        f"<td>{_coins(*sell)}</td>"
+        f"<td>{_coins(*buy)}</td>"
+        f"<td>{_coins(rnd.randint(0, 50), rnd.randint(0, 99), rnd.randint(0, 99))}</td>"
+        f"<td>{rnd.randint(10, 99)}%</td>"
+        + "".join(f"<td>\n  {c}\n</td>" for c in counts)
+        + "</tr>\n"
+    )
+
+
+def search_page(rows=200, seed=0, first_item_id=10000):
+    """Returns the HTML of one results page with `rows` item rows (0 rows = past the last page)."""
+    rnd = random.Random(seed)
+    body = "".join(_result_row(first_item_id + i, rnd) for i in range(rows))
+    nav = "".join(f'<li><a href="/en/tp/search?page={p}">{p}</a></li>' for p in range(1, 30))
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Trading Post Search - GW2BLTC</title>
+<style>.table-result td {{ padding: 2px; }}</style>
+<script>window.dataLayer = window.dataLayer || []; var tpl = "<tr><td>x</td></tr>";</script>
+</head><body>
+<nav class="navbar"><ul>{nav}</ul></nav>
+<form class="search"><table class="table-filter"><tr><td>Profit</td><td><input name="profit-min"></td></tr></table></form>
+<table class="table table-striped table-result">
+<thead><tr><th></th><th>Name</th><th>Sell</th><th>Buy</th><th>Profit</th><th>ROI</th>
+<th>Supply</th><th>Demand</th><th>Sold</th><th>Offers</th><th>Bought</th><th>Bids</th></tr></thead>
+<tbody>
+{body}</tbody>
+</table>
+<ul class="pagination">{nav}</ul>
+<footer><p>Guild Wars 2 &copy; ArenaNet</p></footer>
+</body></html>
+"""
+
+
+def datawars_history(item_id, start, end, seed=0):
+    """Hourly DataWars2 history records for one item between two datetimes (the /history/json shape)."""
+    rnd = random.Random(f"{seed}-{item_id}")
+    base = rnd.randint(100, 500_000)
+    records = []
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    while hour <= end:
+        buy = max(1, int(base * rnd.uniform(0.85, 1.0)))
+        sell = max(buy + 1, int(base * rnd.uniform(1.0, 1.2)))
+        records.append({
+            "itemID": int(item_id), "date": hour.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "buy_price_avg": buy, "sell_price_avg": sell,
+            "buy_price_max": int(buy * 1.02), "sell_price_min": int(sell * 0.98),
+            "buy_listed": rnd.randint(0, 500), "buy_sold": rnd.randint(0, 300),
+            "sell_listed": rnd.randint(0, 500), "sell_sold": rnd.randint(0, 300),
+            "buy_quantity": rnd.randint(100, 50_000), "sell_quantity": rnd.randint(100, 50_000),
+        })
+        hour += timedelta(hours=1)
+    return records
+
+
+def transactions(size, seed, items=2000, days=90):
+    """`size` completed trading post transactions (the /v2/commerce/transactions/history shape), newest first."""
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    out = []
+    for _ in range(size):
+        purchased = now - timedelta(seconds=rnd.randint(0, days * 86400))
+        out.append({
+            "id": None, "item_id": rnd.randint(1, items),
+            "price": rnd.randint(1, 2_000_000), "quantity": rnd.randint(1, 250),
+            "created": (purchased - timedelta(minutes=rnd.randint(0, 600))).strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            "purchased": purchased.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+        })
+    out.sort(key=lambda tx: tx["purchased"], reverse=True)
+    for i, tx in enumerate(out):  # ids grow with time, like the API's
+        tx["id"] = 5_000_000_000 - i
+    return out
+
+
+def item_payload(item_id):
+    """One /v2/items entry."""
+    rnd = random.Random(item_id)
+    return {
+        "id": int(item_id), "name": f"{rnd.choice(_NAMES)} #{item_id}",
+        "rarity": rnd.choice(["Fine", "Masterwork", "Rare", "Exotic", "Ascended"]),
+        "type": rnd.choice(["CraftingMaterial", "UpgradeComponent", "Weapon", "Armor"]),
+        "vendor_value": rnd.randint(0, 500), "icon": f"https://render.guildwars2.com/file/{item_id}.png",
+    }
+
+
+def price_payload(item_id):
+    """One /v2/commerce/prices entry; about 1 in 20 items has no buy orders."""
+    rnd = random.Random(f"price-{item_id}")
+    sell = rnd.randint(10, 2_000_000)
+    buy = int(sell * rnd.uniform(0.5, 1.0)) if rnd.random() > 0.05 else 0
+    return {
+        "id": int(item_id), "whitelisted": False,
+        "buys": {"quantity": rnd.randint(0, 50_000) if buy else 0, "unit_price": buy},
+        "sells": {"quantity": rnd.randint(1, 50_000), "unit_price": sell},
+    }
+
+
+def listings_payload(item_id, max_levels=300):
+    """One /v2/commerce/listings entry around price_payload's quotes (buys descending, sells ascending)."""
+    price = price_payload(item_id)
+    rnd = random.Random(f"listings-{item_id}")
+
+    def side(best, step, levels):
+        out, unit_price = [], best
+        for _ in range(levels):
+            if unit_price <= 0:
+                break
+            out.append({"listings": rnd.randint(1, 20), "unit_price": unit_price, "quantity": rnd.randint(1, 250)})
+            unit_price += step * rnd.randint(1, max(1, best // 500))
+        return out
+
+    return {
+        "id": int(item_id),
+        "buys": side(price["buys"]["unit_price"], -1, rnd.randint(0, max_levels)) if price["buys"]["unit_price"] else [],
+        "sells": side(price["sells"]["unit_price"], 1, rnd.randint(1, max_levels)),
+    }
@@ -0,0 +1,276 @@
+"""Offline benchmark suite for the scrape, screen, depth, enrich, report and Excel stages.
+
+    python benchmarks/suite.py                           # small + medium inputs, every case
+    python benchmarks/suite.py --sizes large --cases scrape excel
+    python benchmarks/suite.py --save baseline.json      # record a baseline ...
+    python benchmarks/suite.py --compare baseline.json   # ... and fail on regressions
+    python benchmarks/suite.py --record fixtures/        # write the small fixture set to disk
+    python benchmarks/suite.py --fixtures fixtures/      # replay recorded responses instead
+
+HTTP traffic goes to a local FixtureServer (see fixture_server.py); nothing leaves the
+machine. Each case reports throughput (best of --repeat runs) and the tracemalloc peak of
+one extra run; the in-process fixture server's allocations count towards that peak.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import scraper  # noqa: E402
+import order_book  # noqa: E402
+import screener  # noqa: E402
+import transaction_scraper  # noqa: E402
+from cost_basis import match_lots  # noqa: E402
+from excel_writer import write_results_workbook  # noqa: E402
+from fixture_server import (  # noqa: E402
+    HISTORY_PATH, ITEMS_PATH, LISTINGS_PATH, PRICES_PATH, SEARCH_PATH, TRANSACTIONS_PATH, FixtureServer, FixtureSet,
+)
+from fixtures import listings_payload  # noqa: E402
+from flip_metrics import compute_flip_metrics  # noqa: E402
+
+SIZES = {
+    "small": {"pages": 2, "items": 200, "transactions": 10_000, "universe": 5_000},
+    "medium": {"pages": 10, "items": 1_000, "transactions": 50_000, "universe": 27_000},
+    "large": {"pages": 50, "items": 5_000, "transactions": 200_000, "universe": 60_000},
+}
+ROWS_PER_PAGE = 200
+REPORT_DAYS = 90
+
+
+def quiet(message):
+    pass
+
+
+def snapshot_frame(page_items):
+    """The per-item columns run_scraper builds from parsed result pages."""
+    return pd.DataFrame({
+        "Item Name": [item["item_name"] for item in page_items],
+        "Item Link": [item["item_link"] for item in page_items],
+        "Date of Scrape": "2025-01-01 00:00",
+        **{col: [item[col] for item in page_items] for col in [
+            "Buy Price (Inst.)", "Sell Price (Inst.)", "Demand", "Supply", "Bought", "Sold", "Bids", "Offers"]},
+    })
+
+
+# Each case takes (size spec, fixtures) and returns (unit, fn); fn runs the stage once and
+# returns the number of units it processed.
+
+def case_scrape(size, fixtures):
+    def run():
+        with tempfile.TemporaryDirectory() as out:
+            scraper.run_scraper(False, out, pages=len(fixtures.pages), status_callback=quiet, workers=4, excel=False)
+        return len(fixtures.parsed)
+    return "rows", run
+
+
+def case_screen(size, fixtures):
+    def run():
+        with tempfile.TemporaryDirectory() as out:
+            screener.run_screener(out, status_callback=quiet, item_cache=False, excel=False)
+        return len(fixtures.price_ids())
+    return "items", run
+
+
+def case_depth(size, fixtures):
+    """Fill-cost and queue lookups over the order books of `items` items (the book is built once)."""
+    book = order_book.OrderBook([listings_payload(i) for i in range(1, size["items"] + 1)])
+    rows = np.arange(len(book))
+    qty = np.full(len(book), 100)
+
+    def run():
+        book.sells.average_price(rows, qty)
+        book.buys.units_ahead(rows, book.buys.price[:, 0])
+        book.sells.units_ahead(rows, book.sells.price[:, 0])
+        return len(book)
+    return "items", run
+
+
+def case_enrich(size, fixtures):
+    ids = [item["item_id"] for item in fixtures.parsed[:size["items"]]]
+    batches = [ids[i:i + scraper.DATAWARS_BATCH_SIZE] for i in range(0, len(ids), scraper.DATAWARS_BATCH_SIZE)]
+
+    def run():
+        enriched = 0
+        for batch in batches:
+            enriched += sum(1 for v in scraper.get_datawars_data(batch, quiet, days=7).values() if v)
+        return enriched
+    return "items", run
+
+
+def case_aggregate(size, fixtures):
+    def run():
+        buys = transaction_scraper.filter_last_n_days_df(fixtures.buys, quiet, n=REPORT_DAYS)
+        sells = transaction_scraper.filter_last_n_days_df(fixtures.sells, quiet, n=REPORT_DAYS)
+        transaction_scraper.aggregate_transactions_df(buys, sells)
+        return len(fixtures.buys) + len(fixtures.sells)
+    return "tx", run
+
+
+def case_aggregate_list(size, fixtures):
+    def run():
+        buys = transaction_scraper.filter_last_n_days(fixtures.buys, quiet, n=REPORT_DAYS)
+        sells = transaction_scraper.filter_last_n_days(fixtures.sells, quiet, n=REPORT_DAYS)
+        transaction_scraper.aggregate_transactions(buys, sells)
+        return len(fixtures.buys) + len(fixtures.sells)
+    return "tx", run
+
+
+def case_report(size, fixtures):
+    buys = transaction_scraper.filter_last_n_days_df(fixtures.buys, quiet, n=REPORT_DAYS)
+    sells = transaction_scraper.filter_last_n_days_df(fixtures.sells, quiet, n=REPORT_DAYS)
+    agg = transaction_scraper.aggregate_transactions_df(buys, sells)
+    lots, daily = match_lots(fixtures.buys, fixtures.sells)
+    names = {iid: fixtures.item(iid)["name"] for iid in set(agg) | set(lots)}
+
+    def run():
+        with tempfile.TemporaryDirectory() as out:
+            transaction_scraper.save_profit_report(agg, names, out, quiet, lots=lots, daily=daily)
+        return len(names)
+    return "items", run
+
+
+def case_excel(size, fixtures):
+    df = snapshot_frame(fixtures.parsed)
+
+    def run():
+        combined = compute_flip_metrics(scraper.results_frame(df))
+        with tempfile.TemporaryDirectory() as out:
+            write_results_workbook(combined, os.path.join(out, "scraper-results-new.xlsx"))
+        return len(combined)
+    return "rows", run
+
+
+def case_transactions_e2e(size, fixtures):
+    def run():
+        with tempfile.TemporaryDirectory() as out:
+            transaction_scraper.run_transaction_scraper("benchmark", out, quiet, days=REPORT_DAYS,
+                                                        item_cache=False, use_ledger=False)
+        return len(fixtures.buys) + len(fixtures.sells)
+    return "tx", run
+
+
+CASES = {
+    "scrape": case_scrape,
+    "screen": case_screen,
+    "depth": case_depth,
+    "enrich": case_enrich,
+    "aggregate": case_aggregate,
+    "aggregate_list": case_aggregate_list,
+    "report": case_report,
+    "excel": case_excel,
+    "transactions_e2e": case_transactions_e2e,
+}
+
+
+def point_clients_at(base_url):
+    scraper.BASE_URL = base_url + SEARCH_PATH
+    scraper.DATAWARS_API_URL = base_url + HISTORY_PATH
+    transaction_scraper.TRANSACTIONS_URL = base_url + TRANSACTIONS_PATH
+    transaction_scraper.ITEMS_URL = base_url + ITEMS_PATH
+    screener.PRICES_URL = base_url + PRICES_PATH
+    order_book.LISTINGS_URL = base_url + LISTINGS_PATH
+
+
+def measure(fn, repeat, memory):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = fn()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return count, best, peak
+
+
+def compare(results, baseline_path, tolerance):
+    """Returns the regressions of `results` against a saved run (slower or hungrier by more than tolerance)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["case"], r["size"]): r for r in json.load(f)}
+    regressions = []
+    for r in results:
+        base = baseline.get((r["case"], r["size"]))
+        if base is None:
+            continue
+        if r["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{r['case']}/{r['size']}: {r['throughput']:.0f} {r['unit']}/s "
+                               f"vs {base['throughput']:.0f} baseline")
+        if r["peak_bytes"] and base.get("peak_bytes") and r["peak_bytes"] > base["peak_bytes"] * (1 + tolerance):
+            regressions.append(f"{r['case']}/{r['size']}: peak {r['peak_bytes'] / 2**20:.1f} MiB "
+                               f"vs {base['peak_bytes'] / 2**20:.1f} MiB baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--no_memory", action="store_true", help="Skip the tracemalloc peak-memory run")
+    parser.add_argument("--fixtures", help="Directory of recorded responses to replay instead of synthetic data")
+    parser.add_argument("--record", help="Write the synthetic fixtures of the first size to this directory and exit")
+    parser.add_argument("--save", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Saved results to compare against; exits 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown / memory growth vs --compare")
+    args = parser.parse_args()
+
+    if args.record:
+        spec = SIZES[args.sizes[0]]
+        FixtureSet.synthetic(spec["pages"], ROWS_PER_PAGE, spec["transactions"], spec["items"],
+                             spec["universe"]).save(args.record)
+        print(f"Wrote {args.sizes[0]} fixtures to {args.record}")
+        return
+
+    if args.fixtures:
+        recorded = FixtureSet.load(args.fixtures)
+        sizes = {"recorded": (None, recorded)}
+    else:
+        sizes = {name: (SIZES[name], None) for name in args.sizes}
+
+    results = []
+    print(f"{'case':<18}{'size':<10}{'count':>9}  {'time':>10}  {'throughput':>16}  {'peak':>10}")
+    with FixtureServer(FixtureSet([], [], [])) as server:
+        point_clients_at(server.base_url)
+        for size_name, (spec, fixtures) in sizes.items():
+            if fixtures is None:
+                fixtures = FixtureSet.synthetic(spec["pages"], ROWS_PER_PAGE, spec["transactions"], spec["items"],
+                                                spec["universe"])
+            fixtures.parsed = [item for page in fixtures.pages for item in scraper.parse_page(page.decode())]
+            if spec is None:
+                spec = {"pages": len(fixtures.pages), "items": len(fixtures.parsed), "transactions": len(fixtures.buys),
+                        "universe": len(fixtures.price_ids())}
+            server.fixtures = fixtures
+            for case_name in args.cases:
+                unit, fn = CASES[case_name](spec, fixtures)
+                count, elapsed, peak = measure(fn, args.repeat, not args.no_memory)
+                result = {"case": case_name, "size": size_name, "count": count, "unit": unit,
+                          "seconds": elapsed, "throughput": count / elapsed if elapsed else 0.0, "peak_bytes": peak}
+                results.append(result)
+                peak_text = f"{peak / 2**20:7.1f} MiB" if peak is not None else "-"
+                print(f"{case_name:<18}{size_name:<10}{count:>9}  {elapsed * 1000:8.1f}ms  "
+                      f"{result['throughput']:>10.0f} {unit}/s  {peak_text:>10}", flush=True)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            sys.exit("Regressions:\n  " + "\n  ".join(regressions))
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
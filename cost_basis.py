@@ -0,0 +1,90 @@
+from collections import defaultdict, deque
+
+import numpy as np
+import pandas as pd
+
+from flip_metrics import TP_FEE_MULTIPLIER
+
+
+def _events(transactions, side):
+    df = pd.DataFrame(transactions, columns=["item_id", "price", "quantity", "created", "purchased"])
+    dates = df["purchased"].where(df["purchased"].notna() & (df["purchased"] != ""), df["created"])
+    return pd.DataFrame({
+        "time": pd.to_datetime(dates, utc=True, errors="coerce", format="ISO8601"),
+        "side": side,
+        "item_id": df["item_id"],
+        "price": df["price"],
+        "quantity": df["quantity"],
+    }).dropna(subset=["time"])
+
+
+def _new_item():
+    return {"matched_qty": 0, "cost": 0, "proceeds": 0.0, "hold_seconds": 0.0, "unmatched_qty": 0}
+
+
+def match_lots(buys, sells, since=None, fee_multiplier=TP_FEE_MULTIPLIER, now=None):
+    """FIFO cost-basis matching of sells against earlier buys, per item.
+
+    Buys and sells (API dicts or DataFrames) are merged into one time-ordered stream
+    (O(n log n) sort, buys first on equal timestamps) and walked once with a FIFO deque
+    of open lots per item. All money is in copper; proceeds are net of the trading post fee.
+
+    Only sells at or after `since` (a tz-aware timestamp) count towards realized figures,
+    but every earlier sell still consumes lots so the cost basis stays correct.
+
+    Returns (items, daily):
+      items  {item_id: {matched_qty, cost, proceeds, profit, roi, avg_hold_hours,
+                        unmatched_qty, open_qty, open_cost, open_age_hours}}
+      daily  {date: realized profit in copper} keyed by the sell's UTC date
+    """
+    events = pd.concat([_events(buys, 0), _events(sells, 1)], ignore_index=True)
+    order = np.lexsort((events["side"].to_numpy(), events["time"].to_numpy()))
+    events = events.iloc[order]
+
+    since = pd.Timestamp(since) if since is not None else None
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz="UTC")
+    lots = defaultdict(deque)  # item_id -> deque of [qty, unit price, buy time]
+    items = defaultdict(_new_item)
+    daily = defaultdict(float)
+
+    for time, side, item_id, price, qty in events.itertuples(index=False, name=None):
+        queue = lots[item_id]
+        if side == 0:
+            queue.append([qty, price, time])
+            continue
+        realized = since is None or time >= since
+        stats = items[item_id] if realized else None
+        remaining = qty
+        while remaining and queue:
+            lot = queue[0]
+            take = min(remaining, lot[0])
+            if realized:
+                cost = take * lot[1]
+                proceeds = take * price * fee_multiplier
+                stats["matched_qty"] += take
+                stats["cost"] += cost
+                stats["proceeds"] += proceeds
+                stats["hold_seconds"] += take * (time - lot[2]).total_seconds()
+                daily[time.strftime("%Y-%m-%d")] += proceeds - cost
+            lot[0] -= take
+            remaining -= take
+            if not lot[0]:
+                queue.popleft()
+        if realized and remaining:
+            stats["unmatched_qty"] += remaining
+
+    for item_id, queue in lots.items():
+        if not queue and item_id not in items:
+            continue
+        stats = items[item_id]
+        stats["open_qty"] = sum(lot[0] for lot in queue)
+        stats["open_cost"] = sum(lot[0] * lot[1] for lot in queue)
+        open_age = sum(lot[0] * (now - lot[2]).total_seconds() for lot in queue)
+        stats["open_age_hours"] = open_age / stats["open_qty"] / 3600 if stats["open_qty"] else 0.0
+
+    for stats in items.values():
+        stats["profit"] = stats["proceeds"] - stats["cost"]
+        stats["roi"] = stats["profit"] / stats["cost"] if stats["cost"] else 0.0
+        stats["avg_hold_hours"] = stats["hold_seconds"] / stats["matched_qty"] / 3600 if stats["matched_qty"] else 0.0
+        del stats["hold_seconds"]
+    return dict(items), dict(sorted(daily.items()))
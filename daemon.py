@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+import metrics
+from scraper import run_scraper, PAGE_PARSER_DEFAULT
+from transaction_scraper import run_transaction_scraper
+
+STATUS_HOST_DEFAULT = "127.0.0.1"
+STATUS_PORT_DEFAULT = 8765
+LOG_TAIL = 200  # log lines kept per job for the status endpoint
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat(timespec="seconds") if ts else None
+
+
+class Job:
+    """Runs `func(**kwargs, status_callback=...)` every `interval` seconds on its own thread.
+
+    The interval is measured from the start of one cycle to the start of the next; a cycle
+    that overruns is followed immediately by the next one. Exceptions are logged and counted,
+    they never stop the loop.
+    """
+
+    def __init__(self, name, func, interval, kwargs, on_cycle=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.kwargs = kwargs
+        self.on_cycle = on_cycle
+        self.log_tail = deque(maxlen=LOG_TAIL)
+        self.runs = 0
+        self.failures = 0
+        self.running = False
+        self.last_started = None
+        self.last_finished = None
+        self.last_duration = None
+        self.last_error = None
+        self.next_run = time.time()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def log(self, message):
+        line = f"{datetime.now():%Y-%m-%d %H:%M:%S} [{self.name}] {message}"
+        print(line, flush=True)
+        with self._lock:
+            self.log_tail.append(line)
+
+    def trigger(self):
+        """Starts the next cycle now instead of waiting for the interval."""
+        self._wake.set()
+
+    def run_once(self):
+        with self._lock:
+            self.running = True
+            self.last_started = time.time()
+        error = None
+        try:
+            self.func(**self.kwargs, status_callback=self.log)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            self.log(f"Cycle failed: {error}\n{traceback.format_exc()}")
+        with self._lock:
+            self.running = False
+            self.runs += 1
+            self.failures += error is not None
+            self.last_error = error
+            self.last_finished = time.time()
+            self.last_duration = self.last_finished - self.last_started
+            self.next_run = self.last_started + self.interval
+        self.log(f"Cycle finished in {self.last_duration:.1f}s. Next run at {_iso(self.next_run)}.")
+        if self.on_cycle is not None:
+            self.on_cycle()
+
+    def loop(self, stop_event):
+        while not stop_event.is_set():
+            self._wake.clear()
+            self.run_once()
+            # Wake up for the next cycle, an explicit trigger or shutdown, whichever comes first
+            while not stop_event.is_set() and not self._wake.is_set():
+                remaining = self.next_run - time.time()
+                if remaining <= 0:
+                    break
+                self._wake.wait(min(remaining, 1.0))
+
+    def status(self):
+        with self._lock:
+            return {
+                "interval_seconds": self.interval,
+                "running": self.running,
+                "runs": self.runs,
+                "failures": self.failures,
+                "last_started": _iso(self.last_started),
+                "last_finished": _iso(self.last_finished),
+                "last_duration_seconds": round(self.last_duration, 2) if self.last_duration is not None else None,
+                "last_error": self.last_error,
+                "next_run": _iso(self.next_run),
+                "log": list(self.log_tail)[-20:],
+            }
+
+
+class Daemon:
+    """Keeps one warm process (imports, pooled HTTP sessions, on-disk caches) running the
+    scrapers on a schedule, with an optional status endpoint on localhost: GET /status (JSON),
+    GET /metrics (Prometheus text) and POST /run/<job>.
+
+    After every cycle the status of all jobs is also written to `<output_dir>/daemon-status.json`.
+    """
+
+    def __init__(self, output_dir, status_host=STATUS_HOST_DEFAULT, status_port=STATUS_PORT_DEFAULT):
+        self.output_dir = output_dir
+        self.status_host = status_host
+        self.status_port = status_port
+        self.started = time.time()
+        self.jobs = {}
+        self._stop = threading.Event()
+        self._threads = []
+        self._server = None
+        self._status_lock = threading.Lock()
+
+    def add_job(self, name, func, interval, **kwargs):
+        self.jobs[name] = Job(name, func, interval, kwargs, on_cycle=self.persist_status)
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "started": _iso(self.started),
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "jobs": {name: job.status() for name, job in self.jobs.items()},
+        }
+
+    def persist_status(self):
+        path = os.path.join(self.output_dir, "daemon-status.json")
+        with self._status_lock:
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(self.status(), f, indent=2)
+            os.replace(f"{path}.tmp", path)
+
+    def _make_handler(self):
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def _send_json(self, code, payload):
+                self._send(code, json.dumps(payload, indent=2).encode(), "application/json")
+
+            def _send(self, code, body, content_type):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path in ("/", "/status"):
+                    self._send_json(200, daemon.status())
+                elif self.path == "/metrics":
+                    # Cumulative stage timings and counters since the daemon started
+                    self._send(200, metrics.to_prometheus(metrics.snapshot()).encode(), "text/plain; version=0.0.4")
+                else:
+                    self._send_json(404, {"error": f"unknown path {self.path}"})
+
+            def do_POST(self):
+                # POST /run/<job> starts a cycle right away
+                name = self.path[len("/run/"):] if self.path.startswith("/run/") else None
+                job = daemon.jobs.get(name)
+                if job is None:
+                    self._send_json(404, {"error": f"unknown job {name}", "jobs": list(daemon.jobs)})
+                    return
+                job.trigger()
+                self._send_json(202, {"triggered": name})
+
+            def log_message(self, format, *args):
+                pass
+
+        return StatusHandler
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.status_port:
+            self._server = ThreadingHTTPServer((self.status_host, self.status_port), self._make_handler())
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            print(f"Status endpoint listening on http://{self.status_host}:{self._server.server_port}/status", flush=True)
+        for job in self.jobs.values():
+            thread = threading.Thread(target=job.loop, args=(self._stop,), name=job.name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def wait(self):
+        """Blocks until `stop` is called, then lets running cycles finish."""
+        while not self._stop.wait(1.0):
+            pass
+        if self._server is not None:
+            self._server.shutdown()
+        for thread in self._threads:
+            thread.join()
+        self.persist_status()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the GW2 scrapers on a schedule in one long-lived process")
+    parser.add_argument('--output_dir', type=str, default='.', help='Directory for all outputs and caches')
+    parser.add_argument('--scraper_interval', type=float, default=60, help='Minutes between item scraper runs (0 to disable)')
+    parser.add_argument('--transactions_interval', type=float, default=360, help='Minutes between profit report runs (0 to disable)')
+    parser.add_argument('--historical', action='store_true', help='Query DataWars2 API for historical data')
+    parser.add_argument('--days', type=int, default=7, help='Number of days of historical data to query')
+    parser.add_argument('--pages', type=int, default=0, help='Number of pages to scrape (0 for all)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of pages to fetch concurrently')
+    parser.add_argument('--shards', type=int, default=1, help='Split the search into this many profit-%% bands crawled in parallel')
+    parser.add_argument('--datawars_workers', type=int, default=2, help='Number of concurrent DataWars2 batch requests')
+    parser.add_argument('--parser', choices=['fast', 'soup'], default=PAGE_PARSER_DEFAULT, help='HTML parser backend for result pages')
+    parser.add_argument('--no_excel', action='store_true', help='Only append to the scrape history store, skip the Excel export')
+    parser.add_argument('--trans_days', type=int, default=30, help='Days of transaction history in the profit report')
+    parser.add_argument('--api_key', type=str, default=os.environ.get("GW2_API_KEY"), help='GW2 API key (defaults to $GW2_API_KEY)')
+    parser.add_argument('--status_host', type=str, default=STATUS_HOST_DEFAULT, help='Address of the status endpoint')
+    parser.add_argument('--status_port', type=int, default=STATUS_PORT_DEFAULT, help='Port of the status endpoint (0 to disable)')
+    args = parser.parse_args()
+
+    daemon = Daemon(args.output_dir, status_host=args.status_host, status_port=args.status_port)
+    if args.scraper_interval > 0:
+        daemon.add_job("scraper", run_scraper, args.scraper_interval * 60,
+                       historical=args.historical, output_dir=args.output_dir, days=args.days, pages=args.pages,
+                       workers=args.workers, datawars_workers=args.datawars_workers, parser=args.parser,
+                       excel=not args.no_excel, shards=args.shards)
+    if args.transactions_interval > 0:
+        if args.api_key:
+            daemon.add_job("transactions", run_transaction_scraper, args.transactions_interval * 60,
+                           api_key=args.api_key, output_dir=args.output_dir, days=args.trans_days)
+        else:
+            print("No API key given (--api_key or GW2_API_KEY); the profit report job is disabled.")
+    if not daemon.jobs:
+        parser.error("no jobs enabled")
+
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    daemon.start()
+    try:
+        daemon.wait()
+    except KeyboardInterrupt:
+        daemon.stop()
+        daemon.wait()
@@ -0,0 +1,120 @@
+import math
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from flip_metrics import TP_FEE_MULTIPLIER
+
+# Column-level number formats for the scraper-results sheet
+NUMBER_FORMATS = {
+    "Buy Price (Inst.)": '0.00', "Sell Price (Inst.)": '0.00',
+    "Demand": '#,##0', "Supply": '#,##0', "Bought": '#,##0', "Sold": '#,##0', "Bids": '#,##0', "Offers": '#,##0',
+    "Avg Buy Price": '0.00', "Avg Sell Price": '0.00',
+    "Std Dev Buy Price": '0.00', "Std Dev Sell Price": '0.00',
+    "Coefficient of Variation (Buy)": '0%', "Coefficient of Variation (Sell)": '0%',
+    "Instantaneous Volatility (Buy)": '0%', "Instantaneous Volatility (Sell)": '0%',
+    "Overcut (%)": '0%', "Undercut (%)": '0%', "Overcut (g)": '0.00', "Undercut (g)": '0.00',
+    "Max Flips / Day": '0', "Bought/Bids": '0.00', "Sold/Offers": '0.00',
+    "Buy-Through Rate (%)": '0%', "Sell-Through Rate (%)": '0%', "Flip-Through Rate (%)": '0%',
+    "Optimal Qty": '0', "Dynamic Sell-Through Rate (%)": '0%', "E(Sales | Q = Optimal Q)": '0',
+    "E(Profit | Q = Optimal Q)": '0.00', "Optimal Investment (g)": '0.00', "E(ROI | Q = Optimal Q)": '0%',
+    "Time to Sell (Q Optimal)": '0.00',
+    "Target ROI": '0%', "Optimal Buy Price | Target ROI": '0.00', "Optimal Qty | Target ROI": '0',
+    "Theoretical Return | Target ROI": '0.00',
+    "Actual Qty Ordered": '0', "Actual Buy Price": '0.00',
+    "Buy Units Ahead": '#,##0', "Sell Units Ahead": '#,##0', "Depth Optimal Qty": '0',
+    "Avg Instant Buy (g) | Depth Qty": '0.00',
+}
+
+# Python equivalents of the Excel formats, used to size columns from the DataFrame
+_DISPLAY_FORMATS = {'0.00': "{:.2f}", '0%': "{:.0%}", '0': "{:.0f}", '#,##0': "{:,.0f}"}
+
+
+def formula_templates(L, target_roi):
+    """Returns {column: formula} for the derived columns, with `{r}` standing for the row number."""
+    def c(name): return L(name) + "{r}"
+    fee = TP_FEE_MULTIPLIER
+    return {
+        "Coefficient of Variation (Buy)": f'=IFERROR({c("Std Dev Buy Price")}/{c("Avg Buy Price")},0)',
+        "Coefficient of Variation (Sell)": f'=IFERROR({c("Std Dev Sell Price")}/{c("Avg Sell Price")},0)',
+        "Instantaneous Volatility (Buy)": f'=IFERROR(({c("Buy Price (Inst.)")}-{c("Avg Buy Price")})/{c("Avg Buy Price")},0)',
+        "Instantaneous Volatility (Sell)": f'=IFERROR(({c("Sell Price (Inst.)")}-{c("Avg Sell Price")})/{c("Avg Sell Price")},0)',
+        "Overcut (g)": f'={c("Buy Price (Inst.)")}*{c("Overcut (%)")}',
+        "Undercut (g)": f'={c("Sell Price (Inst.)")}*{c("Undercut (%)")}',
+        "Max Flips / Day": f'=MIN({c("Bought")},{c("Sold")})',
+        "Bought/Bids": f'=IFERROR({c("Bought")}/{c("Bids")},"")',
+        "Sold/Offers": f'=IFERROR({c("Sold")}/{c("Offers")},"")',
+        "Buy-Through Rate (%)": f'=IF({c("Bids")}=0,IF({c("Bought")}>0,1,0),MIN(1,{c("Bought")}/{c("Bids")}))',
+        "Sell-Through Rate (%)": f'=IF({c("Offers")}=0,IF({c("Sold")}>0,1,0),MIN(1,{c("Sold")}/{c("Offers")}))',
+        "Flip-Through Rate (%)": f'={c("Buy-Through Rate (%)")}*{c("Sell-Through Rate (%)")}',
+        "Optimal Qty": f'=LET(q,ROUND(SQRT({c("Sold")}*{c("Offers")}*{c("Undercut (g)")}*{fee}/{c("Overcut (g)")})-{c("Offers")}),IF(q<0,0,MIN(q,{c("Max Flips / Day")})))',
+        "Dynamic Sell-Through Rate (%)": f'=IFERROR(IF({c("Optimal Qty")}>0,MIN(1,{c("Sold")}/({c("Offers")}+{c("Optimal Qty")})),NA()),"")',
+        "E(Sales | Q = Optimal Q)": f'=ROUND({c("Optimal Qty")}*{c("Dynamic Sell-Through Rate (%)")}, 0)',
+        "E(Profit | Q = Optimal Q)": f'={c("E(Sales | Q = Optimal Q)")}*{c("Undercut (g)")}*{fee}-{c("Overcut (g)")}*{c("Optimal Qty")}',
+        "Optimal Investment (g)": f'={c("Optimal Qty")}*{c("Overcut (g)")}',
+        "E(ROI | Q = Optimal Q)": f'=IFERROR({c("E(Profit | Q = Optimal Q)")}/{c("Optimal Investment (g)")},0)',
+        "Time to Sell (Q Optimal)": f'=({c("Offers")} + {c("Optimal Qty")})/{c("Sold")}',
+        "Target ROI": f'={target_roi}',
+        "Optimal Buy Price | Target ROI": f'=IFERROR(({c("Undercut (g)")}*{fee})/(1+{c("Target ROI")}), 0)',
+        "Optimal Qty | Target ROI": f'=IF({c("Optimal Buy Price | Target ROI")} < {c("Buy Price (Inst.)")}, 0, LET(q,ROUND(SQRT({c("Sold")}*{c("Offers")}*{c("Undercut (g)")}*{fee}/{c("Optimal Buy Price | Target ROI")}) - {c("Offers")}), IF(q<0,0,MIN(q,{c("Max Flips / Day")}))))',
+        "Theoretical Return | Target ROI": f'=({c("Undercut (g)")}*{fee}-{c("Optimal Buy Price | Target ROI")})*{c("Optimal Qty | Target ROI")}',
+    }
+
+
+def _display_len(value, fmt):
+    if value is None:
+        return 0
+    if fmt in _DISPLAY_FORMATS and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return len(_DISPLAY_FORMATS[fmt].format(value))
+    return len(str(value))
+
+
+def _clean(value):
+    """Converts a DataFrame value to something openpyxl writes natively ("" and NaN become blank cells)."""
+    if value is None or (isinstance(value, str) and not value):
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):  # NumPy scalar
+        return _clean(value.item())
+    return value
+
+
+def write_results_workbook(df, output_file, sheet_title="scraper-results", formulas=None):
+    """Writes `df` to `output_file` in a single streaming pass.
+
+    Rows go through a write-only workbook, number formats are applied per column and
+    column widths are computed from the DataFrame rather than re-read from cells.
+    `formulas`, if given, is the {column: template} mapping from `formula_templates`;
+    those columns get a formula per row instead of the DataFrame value.
+    """
+    formulas = formulas or {}
+    columns = [str(c) for c in df.columns]
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_title)
+    ws.freeze_panes = 'B2'
+    ws.auto_filter.ref = f"A1:{get_column_letter(len(columns))}{len(df) + 1}"
+
+    for idx, col in enumerate(columns):
+        fmt = NUMBER_FORMATS.get(col)
+        width = len(col)
+        if col not in formulas:
+            width = max(width, max((_display_len(_clean(v), fmt) for v in df.iloc[:, idx]), default=0))
+        ws.column_dimensions[get_column_letter(idx + 1)].width = max(8, width + 2)
+
+    ws.append(columns)
+    layout = [(NUMBER_FORMATS.get(col), formulas.get(col)) for col in columns]
+    for r, values in enumerate(df.itertuples(index=False, name=None), start=2):
+        out = []
+        for (fmt, formula), value in zip(layout, values):
+            value = formula.replace("{r}", str(r)) if formula else _clean(value)
+            if fmt is None:
+                out.append(value)
+                continue
+            cell = WriteOnlyCell(ws, value)
+            cell.number_format = fmt
+            out.append(cell)
+        ws.append(out)
+    wb.save(output_file)
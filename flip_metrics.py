@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+TP_FEE_MULTIPLIER = 0.85  # seller keeps 85% after the 5% listing fee and 10% exchange fee
+
+# Columns derived from the scraped inputs, in the order the Excel formulas define them
+DERIVED_COLUMNS = [
+    "Coefficient of Variation (Buy)", "Coefficient of Variation (Sell)",
+    "Instantaneous Volatility (Buy)", "Instantaneous Volatility (Sell)",
+    "Overcut (g)", "Undercut (g)", "Max Flips / Day", "Bought/Bids", "Sold/Offers",
+    "Buy-Through Rate (%)", "Sell-Through Rate (%)", "Flip-Through Rate (%)",
+    "Optimal Qty", "Dynamic Sell-Through Rate (%)", "E(Sales | Q = Optimal Q)",
+    "E(Profit | Q = Optimal Q)", "Optimal Investment (g)", "E(ROI | Q = Optimal Q)", "Time to Sell (Q Optimal)",
+    "Optimal Buy Price | Target ROI", "Optimal Qty | Target ROI", "Theoretical Return | Target ROI",
+]
+
+
+def excel_round(x):
+    """ROUND(x, 0) as Excel does it: halves go away from zero (NumPy rounds them to even)."""
+    return np.sign(x) * np.floor(np.abs(x) + 0.5)
+
+
+def numeric_column(df, col):
+    """Column `col` as a float array; blanks and text become NaN."""
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+
+def safe_div(a, b):
+    """a / b with NaN wherever the result is not finite."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = a / b
+    return np.where(np.isfinite(out), out, np.nan)
+
+
+def _through_rate(done, listed):
+    """IF(listed=0, IF(done>0,1,0), MIN(1, done/listed))"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(listed == 0, (done > 0).astype(float), np.minimum(1, done / listed))
+
+
+def optimal_qty(sold, offers, undercut, buy_price, max_flips):
+    """LET(q, ROUND(SQRT(Sold*Offers*Undercut*0.85/BuyPrice) - Offers), IF(q<0, 0, MIN(q, Max Flips)))"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = excel_round(np.sqrt(sold * offers * undercut * TP_FEE_MULTIPLIER / buy_price) - offers)
+    q = np.where(np.isfinite(q), q, np.nan)
+    return np.where(q < 0, 0, np.minimum(q, max_flips))
+
+
+def compute_flip_metrics(df):
+    """Computes every derived flip column with array operations, matching the Excel formulas.
+
+    Cells that would evaluate to an Excel error (or to "") come out as NaN; IFERROR(..., 0)
+    fallbacks come out as 0. Returns a copy of `df` with the derived columns filled in.
+    """
+    df = df.copy()
+    buy_inst, sell_inst = numeric_column(df, "Buy Price (Inst.)"), numeric_column(df, "Sell Price (Inst.)")
+    avg_buy, avg_sell = numeric_column(df, "Avg Buy Price"), numeric_column(df, "Avg Sell Price")
+    std_buy, std_sell = numeric_column(df, "Std Dev Buy Price"), numeric_column(df, "Std Dev Sell Price")
+    bought, sold = numeric_column(df, "Bought"), numeric_column(df, "Sold")
+    bids, offers = numeric_column(df, "Bids"), numeric_column(df, "Offers")
+    overcut_pct, undercut_pct = numeric_column(df, "Overcut (%)"), numeric_column(df, "Undercut (%)")
+    target_roi = numeric_column(df, "Target ROI")
+
+    df["Coefficient of Variation (Buy)"] = np.nan_to_num(safe_div(std_buy, avg_buy))
+    df["Coefficient of Variation (Sell)"] = np.nan_to_num(safe_div(std_sell, avg_sell))
+    df["Instantaneous Volatility (Buy)"] = np.nan_to_num(safe_div(buy_inst - avg_buy, avg_buy))
+    df["Instantaneous Volatility (Sell)"] = np.nan_to_num(safe_div(sell_inst - avg_sell, avg_sell))
+
+    overcut = buy_inst * overcut_pct
+    undercut = sell_inst * undercut_pct
+    max_flips = np.minimum(bought, sold)
+    df["Overcut (g)"] = overcut
+    df["Undercut (g)"] = undercut
+    df["Max Flips / Day"] = max_flips
+    df["Bought/Bids"] = safe_div(bought, bids)
+    df["Sold/Offers"] = safe_div(sold, offers)
+
+    buy_through = _through_rate(bought, bids)
+    sell_through = _through_rate(sold, offers)
+    df["Buy-Through Rate (%)"] = buy_through
+    df["Sell-Through Rate (%)"] = sell_through
+    df["Flip-Through Rate (%)"] = buy_through * sell_through
+
+    opt_qty = optimal_qty(sold, offers, undercut, overcut, max_flips)
+    dynamic_sell_through = np.where(opt_qty > 0, np.minimum(1, safe_div(sold, offers + opt_qty)), np.nan)
+    exp_sales = excel_round(opt_qty * dynamic_sell_through)
+    exp_profit = exp_sales * undercut * TP_FEE_MULTIPLIER - overcut * opt_qty
+    investment = opt_qty * overcut
+    df["Optimal Qty"] = opt_qty
+    df["Dynamic Sell-Through Rate (%)"] = dynamic_sell_through
+    df["E(Sales | Q = Optimal Q)"] = exp_sales
+    df["E(Profit | Q = Optimal Q)"] = exp_profit
+    df["Optimal Investment (g)"] = investment
+    df["E(ROI | Q = Optimal Q)"] = np.nan_to_num(safe_div(exp_profit, investment))
+    df["Time to Sell (Q Optimal)"] = safe_div(offers + opt_qty, sold)
+
+    target_buy = np.nan_to_num(safe_div(undercut * TP_FEE_MULTIPLIER, 1 + target_roi))
+    target_qty = np.where(target_buy < buy_inst, 0,
+                          optimal_qty(sold, offers, undercut, target_buy, max_flips))
+    df["Optimal Buy Price | Target ROI"] = target_buy
+    df["Optimal Qty | Target ROI"] = target_qty
+    df["Theoretical Return | Target ROI"] = (undercut * TP_FEE_MULTIPLIER - target_buy) * target_qty
+    return df
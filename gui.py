@@ -2,12 +2,92 @@ import customtkinter as ctk
 from tkinter import filedialog
 import os
 import json
+import queue
 import threading
 import webbrowser
-from scraper import run_scraper
-from transaction_scraper import run_transaction_scraper
+from collections import deque
+from datetime import datetime
+from runner import WorkerRunner
 
 CONFIG_FILE = "config.json"
+LOG_FILE = "gui.log"
+POLL_INTERVAL_MS = 50
+LOG_FLUSH_MS = 16  # about one frame
+LOG_MAX_LINES = 5000
+RESULT_PREVIEW_ROWS = 200  # latest scraped rows shown in the Results tab
+
+# scraper and transaction_scraper pull in pandas, openpyxl, plotly, etc.; they are imported
+# by the worker threads on first use so the window comes up without waiting for them.
+def run_scraper(*args, **kwargs):
+    from scraper import run_scraper
+    return run_scraper(*args, **kwargs)
+
+def run_transaction_scraper(*args, **kwargs):
+    from transaction_scraper import run_transaction_scraper
+    return run_transaction_scraper(*args, **kwargs)
+
+class LogSink:
+    """Buffers log messages and writes them to the textbox at most once per frame.
+
+    The textbox keeps only the last `max_lines` lines; the full log is appended to `path`
+    by a background writer thread. `write` must be called on the Tk thread.
+    """
+
+    def __init__(self, root, path=LOG_FILE, max_lines=LOG_MAX_LINES):
+        self.root = root
+        self.textbox = None
+        self.max_lines = max_lines
+        self.pending = []
+        self.scheduled = False
+        self.file_queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_file, args=(path,), daemon=True)
+        self.writer.start()
+
+    def write(self, message):
+        self.pending.append(message)
+        self.file_queue.put(f"{datetime.now():%Y-%m-%d %H:%M:%S} {message}\n")
+        if not self.scheduled and self.textbox is not None:
+            self.scheduled = True
+            self.root.after(LOG_FLUSH_MS, self.flush)
+
+    def attach(self, textbox):
+        self.textbox = textbox
+        if self.pending:
+            self.flush()
+
+    def flush(self):
+        self.scheduled = False
+        if not self.pending or self.textbox is None:
+            return
+        text = "\n".join(self.pending[-self.max_lines:]) + "\n"
+        self.pending = []
+        self.textbox.configure(state="normal")
+        self.textbox.insert("end", text)
+        # The widget always ends with an empty line, so "end" is one past the last log line
+        excess = int(self.textbox.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.textbox.delete("1.0", f"{excess + 1}.0")
+        self.textbox.configure(state="disabled")
+        self.textbox.see("end")
+
+    def _write_file(self, path):
+        try:
+            f = open(path, "a", encoding="utf-8")
+        except OSError:
+            f = open(os.devnull, "w")
+        with f:
+            while True:
+                line = self.file_queue.get()
+                if line is None:
+                    return
+                f.write(line)
+                if self.file_queue.empty():
+                    f.flush()
+
+    def close(self):
+        self.file_queue.put(None)
+        self.writer.join(timeout=2)
+
 
 class App(ctk.CTk):
     def __init__(self):
@@ -21,6 +101,7 @@ class App(ctk.CTk):
 
         self.output_dir = os.path.abspath('.')
         self.api_key = ""
+        self.log_sink = LogSink(self)
         self.load_config()
 
         # Scraper Frame
@@ -84,24 +165,42 @@ class App(ctk.CTk):
         self.output_dir_label = ctk.CTkLabel(self.settings_frame, text=f"Output Folder: {self.output_dir}", anchor="w")
         self.output_dir_label.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
 
-        # Log Frame
+        # Log / Results Tabs
         self.log_frame = ctk.CTkFrame(self)
         self.log_frame.grid(row=3, column=0, padx=10, pady=10, sticky="nsew")
         self.log_frame.grid_columnconfigure(0, weight=1)
         self.log_frame.grid_rowconfigure(0, weight=1)
-        self.log_textbox = ctk.CTkTextbox(self.log_frame, state="disabled", wrap="word")
-        self.log_textbox.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+        self.output_tabs = ctk.CTkTabview(self.log_frame)
+        self.output_tabs.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+        for name in ("Log", "Results"):
+            tab = self.output_tabs.add(name)
+            tab.grid_columnconfigure(0, weight=1)
+            tab.grid_rowconfigure(0, weight=1)
+        self.log_textbox = ctk.CTkTextbox(self.output_tabs.tab("Log"), state="disabled", wrap="word")
+        self.log_textbox.grid(row=0, column=0, sticky="nsew")
+        self.log_sink.attach(self.log_textbox)
+        self.results_textbox = ctk.CTkTextbox(self.output_tabs.tab("Results"), state="disabled", wrap="none",
+                                              font=ctk.CTkFont(family="Courier", size=12))
+        self.results_textbox.grid(row=0, column=0, sticky="nsew")
+
+        # Progress / Cancel
+        self.progress_frame = ctk.CTkFrame(self)
+        self.progress_frame.grid(row=4, column=0, padx=10, pady=(0, 10), sticky="ew")
+        self.progress_frame.grid_columnconfigure(0, weight=1)
+        self.progress_label = ctk.CTkLabel(self.progress_frame, text="Idle", anchor="w")
+        self.progress_label.grid(row=0, column=0, padx=10, pady=5, sticky="ew")
+        self.cancel_button = ctk.CTkButton(self.progress_frame, text="Cancel", command=self.cancel_task, state="disabled")
+        self.cancel_button.grid(row=0, column=1, padx=10, pady=5)
+
+        self.runner = None
+        self.progress = {}
+        self.row_count = 0
+        self.latest_rows = deque(maxlen=RESULT_PREVIEW_ROWS)
 
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def log(self, message):
-        self.log_textbox.configure(state="normal")
-        self.log_textbox.insert("end", f"{message}\n")
-        self.log_textbox.configure(state="disabled")
-        self.log_textbox.see("end")
-
-    def safe_log(self, message):
-        self.after(0, self.log, message)
+        self.log_sink.write(message)
 
     def load_config(self):
         try:
@@ -135,6 +234,23 @@ class App(ctk.CTk):
         self.run_scraper_button.configure(state=state)
         self.run_transaction_button.configure(state=state)
         self.output_dir_button.configure(state=state)
+        self.cancel_button.configure(state="normal" if state == "disabled" else "disabled")
+
+    def start_runner(self, runner, task_type, target, *args, **kwargs):
+        self.runner = runner
+        self.progress = {}
+        self.row_count = 0
+        self.latest_rows.clear()
+        self.show_rows()
+        self.progress_label.configure(text="Starting...")
+        runner.start(target, *args, **kwargs)
+        self.poll_runner(runner, task_type, self.output_dir)
+
+    def cancel_task(self):
+        if self.runner is not None and self.runner.is_alive():
+            self.runner.cancel()
+            self.cancel_button.configure(state="disabled")
+            self.log("Cancelling... the task stops at its next checkpoint.")
 
     def start_scraper_thread(self):
         self.set_buttons_state("disabled")
@@ -154,10 +270,9 @@ class App(ctk.CTk):
             self.log("Invalid input for pages. Using default of 0 (all).")
             pages = 0
 
-        thread = threading.Thread(target=run_scraper, args=(historical, self.output_dir, days, pages, self.safe_log))
-        thread.daemon = True
-        thread.start()
-        self.monitor_thread(thread, task_type="scraper", output_dir=self.output_dir)
+        runner = WorkerRunner()
+        self.start_runner(runner, "scraper", run_scraper, historical, self.output_dir, days, pages,
+                          cancel_token=runner.token, progress_callback=runner.progress, row_callback=runner.rows)
 
     def start_transaction_thread(self):
         self.set_buttons_state("disabled")
@@ -175,10 +290,9 @@ class App(ctk.CTk):
             self.log("Invalid input for days. Using default of 30.")
             days = 30
 
-        thread = threading.Thread(target=run_transaction_scraper, args=(api_key, self.output_dir, self.safe_log, days))
-        thread.daemon = True
-        thread.start()
-        self.monitor_thread(thread, task_type="transaction_scraper", output_dir=self.output_dir)
+        runner = WorkerRunner()
+        self.start_runner(runner, "transaction_scraper", run_transaction_scraper, api_key, self.output_dir,
+                          days=days, cancel_token=runner.token)
 
     def show_dashboard(self, output_dir):
         report_path = os.path.join(output_dir, "interactive_report.html")
@@ -194,17 +308,64 @@ class App(ctk.CTk):
         except Exception as e:
             self.log(f"Error opening web browser: {e}")
 
-    def monitor_thread(self, thread, task_type=None, output_dir=None):
-        if thread.is_alive():
-            self.after(100, lambda: self.monitor_thread(thread, task_type, output_dir))
-        else:
-            self.log("--- Task Finished ---")
-            self.set_buttons_state("normal")
-            if task_type == "transaction_scraper":
-                self.show_dashboard(output_dir)
+    def format_progress(self):
+        parts = []
+        for stage, (done, total, eta) in self.progress.items():
+            label = "Pages" if stage == "pages" else "Enriched" if stage == "enrich" else stage
+            text = f"{label} {done}/{total}" if total else f"{label} {done}"
+            if eta is not None:
+                text += f" (ETA {int(eta) // 60}:{int(eta) % 60:02d})"
+            parts.append(text)
+        if self.row_count:
+            parts.append(f"{self.row_count} rows")
+        return " | ".join(parts) or "Running..."
+
+    def show_rows(self):
+        """Redraws the Results tab with the latest scraped rows, newest first."""
+        lines = [f"Latest {len(self.latest_rows)} of {self.row_count} scraped rows, newest first (profit after the 15% fee)",
+                 f"{'Item':<36} {'Buy (g)':>10} {'Sell (g)':>10} {'Profit (g)':>11} {'Sold':>6} {'Bought':>6}"]
+        for row in reversed(self.latest_rows):
+            buy, sell = row["Buy Price (Inst.)"], row["Sell Price (Inst.)"]
+            lines.append(f"{row['item_name'][:36]:<36} {buy:>10.2f} {sell:>10.2f} {sell * 0.85 - buy:>11.2f} "
+                         f"{row['Sold']:>6} {row['Bought']:>6}")
+        self.results_textbox.configure(state="normal")
+        self.results_textbox.delete("1.0", "end")
+        self.results_textbox.insert("end", "\n".join(lines))
+        self.results_textbox.configure(state="disabled")
+
+    def poll_runner(self, runner, task_type=None, output_dir=None):
+        """Applies everything the worker queued since the last poll in one batch."""
+        finished = False
+        error = None
+        rows_seen = self.row_count
+        for event in runner.drain():
+            kind = event[0]
+            if kind == "log":
+                self.log(event[1])
+            elif kind == "progress":
+                _, stage, done, total, eta = event
+                self.progress[stage] = (done, total, eta)
+            elif kind == "rows":
+                self.row_count += len(event[1])
+                self.latest_rows.extend(event[1])
+            elif kind == "done":
+                finished, error = True, event[1]
+        if self.row_count != rows_seen:
+            self.show_rows()
+        if not finished:
+            self.progress_label.configure(text=self.format_progress())
+            self.after(POLL_INTERVAL_MS, lambda: self.poll_runner(runner, task_type, output_dir))
+            return
+        cancelled = runner.token.cancelled
+        self.progress_label.configure(text="Cancelled" if cancelled else "Failed" if error else f"Done. {self.format_progress()}")
+        self.log("--- Task Cancelled ---" if cancelled else "--- Task Finished ---")
+        self.set_buttons_state("normal")
+        if task_type == "transaction_scraper" and not cancelled and error is None:
+            self.show_dashboard(output_dir)
 
     def on_closing(self):
         self.save_config()
+        self.log_sink.close()
         self.destroy()
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+HISTORY_RETENTION_DAYS_DEFAULT = 30
+
+
+def parse_sample_time(date_str):
+    """Converts a DataWars2 `date` string (e.g. 2025-08-01T01:00:00Z) to epoch seconds."""
+    dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+class HistoryStore:
+    """Local SQLite cache of DataWars2 hourly samples, keyed by itemID and timestamp.
+
+    Samples are stored as the raw JSON records returned by the API so they can be fed
+    straight back into `summarize_datawars_history`. A coverage table records, per item, the
+    contiguous time range that has been requested from the API, so hours with no samples
+    are told apart from hours that were never fetched.
+    """
+
+    def __init__(self, path, retention_days=HISTORY_RETENTION_DAYS_DEFAULT):
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS history (
+                item_id TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (item_id, ts)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS coverage (
+                item_id TEXT PRIMARY KEY,
+                start_ts INTEGER NOT NULL,
+                end_ts INTEGER NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def coverage(self, item_ids):
+        """Returns {item_id: (start, end) datetimes of the range fetched without gaps} for the ids that have one."""
+        if not item_ids:
+            return {}
+        placeholders = ",".join("?" * len(item_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT item_id, start_ts, end_ts FROM coverage WHERE item_id IN ({placeholders})",
+                list(item_ids),
+            ).fetchall()
+        return {item_id: (datetime.fromtimestamp(start, timezone.utc), datetime.fromtimestamp(end, timezone.utc))
+                for item_id, start, end in rows}
+
+    def mark_fetched(self, item_ids, start, end):
+        """Records that `start`..`end` was fetched for `item_ids`, extending each item's coverage
+        when the ranges touch and replacing it when they leave a gap."""
+        start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO coverage VALUES (?, ?, ?)
+                ON CONFLICT (item_id) DO UPDATE SET
+                    start_ts = CASE WHEN excluded.start_ts <= end_ts AND excluded.end_ts >= start_ts
+                                    THEN MIN(start_ts, excluded.start_ts) ELSE excluded.start_ts END,
+                    end_ts = CASE WHEN excluded.start_ts <= end_ts AND excluded.end_ts >= start_ts
+                                  THEN MAX(end_ts, excluded.end_ts) ELSE excluded.end_ts END
+            """, [(str(item_id), start_ts, end_ts) for item_id in item_ids])
+            self._conn.commit()
+
+    def add(self, records):
+        """Inserts API records, replacing any sample already stored for the same hour."""
+        rows = []
+        for record in records:
+            if "itemID" not in record or not record.get("date"):
+                continue
+            try:
+                ts = parse_sample_time(record["date"])
+            except ValueError:
+                continue
+            rows.append((str(record["itemID"]), ts, json.dumps(record, separators=(",", ":"))))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO history VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def load(self, item_ids, start):
+        """Returns the cached records for `item_ids` from `start` onwards, oldest first per item."""
+        if not item_ids:
+            return []
+        placeholders = ",".join("?" * len(item_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT record FROM history WHERE item_id IN ({placeholders}) AND ts >= ? ORDER BY item_id, ts",
+                list(item_ids) + [int(start.timestamp())],
+            ).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def evict(self):
+        """Drops samples older than the retention window. Returns the number of rows removed."""
+        cutoff = int((datetime.now(timezone.utc) - timedelta(days=self.retention_days)).timestamp())
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM history WHERE ts < ?", (cutoff,))
+            self._conn.execute("DELETE FROM coverage WHERE end_ts < ?", (cutoff,))
+            self._conn.execute("UPDATE coverage SET start_ts = ? WHERE start_ts < ?", (cutoff, cutoff))
+            self._conn.commit()
+        return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,115 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+# Per-host limits: token-bucket refill rate (requests/s), bucket size and simultaneous requests.
+HOST_POLICIES = {
+    # GW2 API: buckets of 300 requests refilled at 5 per second (i.e. 300/min sustained)
+    "api.guildwars2.com": {"rate": 5.0, "burst": 300, "max_concurrency": 8},
+    "www.gw2bltc.com": {"rate": 4.0, "burst": 8, "max_concurrency": 4},
+    "api.datawars2.ie": {"rate": 10.0, "burst": 20, "max_concurrency": 4},
+}
+DEFAULT_POLICY = {"rate": None, "burst": None, "max_concurrency": 8}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRIES_DEFAULT = 3
+BACKOFF_DEFAULT = 0.5
+MAX_BACKOFF = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire` blocks until a request may be sent."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostClient:
+    """A keep-alive Session plus the rate limiter and concurrency cap for one host."""
+
+    def __init__(self, policy):
+        max_concurrency = policy["max_concurrency"]
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.bucket = TokenBucket(policy["rate"], policy["burst"]) if policy["rate"] else None
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def client_for(host):
+    with _clients_lock:
+        client = _clients.get(host)
+        if client is None:
+            client = _clients[host] = HostClient(HOST_POLICIES.get(host, DEFAULT_POLICY))
+        return client
+
+
+def _retry_delay(attempt, backoff, response=None):
+    """Exponential backoff with full jitter; a Retry-After header (in seconds) takes precedence."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(MAX_BACKOFF, float(retry_after))
+    return random.uniform(0, min(MAX_BACKOFF, backoff * (2 ** attempt)))
+
+
+def get(url, params=None, headers=None, timeout=20, retries=RETRIES_DEFAULT, backoff=BACKOFF_DEFAULT,
+        status_callback=None):
+    """GET through the pooled session for the url's host.
+
+    Waits for the host's rate limiter and concurrency slot, and retries connection errors,
+    timeouts and 429/5xx responses up to `retries` times. Returns the last response (callers
+    still call `raise_for_status`) or raises the last connection error.
+    """
+    host = urlsplit(url).netloc
+    client = client_for(host)
+    for attempt in range(retries + 1):
+        if client.bucket is not None:
+            with metrics.stage(f"http/{host}/wait"):
+                client.bucket.acquire()
+        response = None
+        try:
+            with client.slots, metrics.stage(f"http/{host}"):
+                response = client.session.get(url, params=params, headers=headers, timeout=timeout)
+                if metrics.enabled():
+                    metrics.add(f"http/{host}/requests")
+                    metrics.add(f"http/{host}/bytes", len(response.content))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt == retries:
+                raise
+            reason = str(e)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            reason = f"HTTP {response.status_code}"
+        delay = _retry_delay(attempt, backoff, response)
+        metrics.add(f"http/{host}/retries")
+        if status_callback is not None:
+            status_callback(f"Request to {host} failed ({reason}). Retrying in {delay:.1f}s ({attempt + 1}/{retries})...")
+        time.sleep(delay)
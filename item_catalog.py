@@ -0,0 +1,91 @@
+import sqlite3
+import time
+from email.utils import parsedate_to_datetime
+
+ITEM_MAX_AGE_DAYS_DEFAULT = 7
+_FIELDS = ["id", "name", "rarity", "type", "vendor_value", "icon"]
+
+
+class ItemCatalog:
+    """Local SQLite cache of /v2/items metadata (name, rarity, type, vendor value, icon).
+
+    Each entry remembers when it was fetched and the Last-Modified header that came with it,
+    so entries older than `max_age_days` can be revalidated with If-Modified-Since instead
+    of being downloaded again.
+    """
+
+    def __init__(self, path, max_age_days=ITEM_MAX_AGE_DAYS_DEFAULT):
+        self.path = path
+        self.max_age_days = max_age_days
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                rarity TEXT,
+                type TEXT,
+                vendor_value INTEGER,
+                icon TEXT,
+                fetched_at REAL NOT NULL,
+                last_modified TEXT
+            )
+        """)
+        self._conn.commit()
+
+    def _select(self, columns, ids):
+        ids = list(ids)
+        rows = []
+        for i in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+            chunk = ids[i:i+500]
+            rows.extend(self._conn.execute(
+                f"SELECT {columns} FROM items WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return rows
+
+    def get(self, ids):
+        """Returns {id: metadata dict} for the cached ids."""
+        return {row[0]: dict(zip(_FIELDS, row)) for row in self._select(", ".join(_FIELDS), ids)}
+
+    def names(self, ids):
+        return {item_id: name for item_id, name in self._select("id, name", ids)}
+
+    def missing(self, ids):
+        """Ids that have never been fetched, in input order."""
+        known = {row[0] for row in self._select("id", ids)}
+        return [i for i in ids if i not in known]
+
+    def stale(self, ids):
+        """Returns [(id, last_modified)] for cached entries older than max_age_days."""
+        cutoff = time.time() - self.max_age_days * 86400
+        return [(item_id, last_modified) for item_id, fetched_at, last_modified
+                in self._select("id, fetched_at, last_modified", ids) if fetched_at < cutoff]
+
+    def upsert(self, items, last_modified=None):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(item["id"], item.get("name"), item.get("rarity"), item.get("type"),
+              item.get("vendor_value"), item.get("icon"), now, last_modified)
+             for item in items if isinstance(item, dict) and "id" in item],
+        )
+        self._conn.commit()
+
+    def touch(self, ids):
+        """Marks entries as freshly validated after a 304 Not Modified."""
+        ids = list(ids)
+        self._conn.executemany("UPDATE items SET fetched_at = ? WHERE id = ?", [(time.time(), i) for i in ids])
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def oldest_http_date(dates):
+    """Returns the earliest of several HTTP-date strings, or None if any is missing/unparseable."""
+    parsed = []
+    for value in dates:
+        try:
+            parsed.append((parsedate_to_datetime(value), value))
+        except (TypeError, ValueError):
+            return None
+    return min(parsed)[1] if parsed else None
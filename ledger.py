@@ -0,0 +1,97 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+API_HISTORY_DAYS = 90  # how far back the API's transaction history reaches
+_FIELDS = ["id", "item_id", "price", "quantity", "created", "purchased"]
+
+
+def ledger_path(output_dir, api_key):
+    """One ledger file per account, named after a hash of the API key."""
+    return os.path.join(output_dir, f"ledger-{hashlib.sha1(api_key.encode()).hexdigest()[:10]}.sqlite")
+
+
+def parse_tx_time(date_str):
+    """Parses an ISO-8601 transaction timestamp (e.g. 2015-05-09T17:13:26+00:00); None if invalid."""
+    try:
+        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+
+
+class TransactionLedger:
+    """Local SQLite copy of the account's completed buy/sell transactions, keyed by transaction id.
+
+    The GW2 API only keeps about 90 days of history; the ledger keeps everything it has seen.
+    Each side has a sync watermark: the ledger holds every transaction of that side from the
+    watermark up to the last completed sync, without gaps.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                side TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                price INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                created TEXT,
+                purchased TEXT,
+                PRIMARY KEY (side, id)
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sync_state (side TEXT PRIMARY KEY, watermark TEXT NOT NULL)")
+        self._conn.commit()
+
+    def watermark(self, side):
+        """The side's sync watermark as a datetime, or None if it was never synced completely."""
+        with self._lock:
+            row = self._conn.execute("SELECT watermark FROM sync_state WHERE side = ?", (side,)).fetchone()
+        return parse_tx_time(row[0]) if row else None
+
+    def set_watermark(self, side, when):
+        """Stores the side's watermark; None clears it (e.g. while a sync is in progress)."""
+        with self._lock:
+            if when is None:
+                self._conn.execute("DELETE FROM sync_state WHERE side = ?", (side,))
+            else:
+                self._conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (side, when.isoformat()))
+            self._conn.commit()
+
+    def known_ids(self, side, ids):
+        ids = list(ids)
+        if not ids:
+            return set()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM transactions WHERE side = ? AND id IN ({','.join('?' * len(ids))})",
+                [side] + ids,
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def add(self, side, transactions):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(side, tx["id"], tx["item_id"], tx["price"], tx["quantity"], tx.get("created"), tx.get("purchased"))
+                 for tx in transactions],
+            )
+            self._conn.commit()
+
+    def load(self, side):
+        """Returns the stored transactions in the API's shape, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_FIELDS)} FROM transactions WHERE side = ? ORDER BY purchased DESC, id DESC",
+                (side,),
+            ).fetchall()
+        return [dict(zip(_FIELDS, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,175 @@
+"""Process-wide stage timers and counters.
+
+Stages record calls and wall time, counters record requests, bytes, retries and rows.
+The process-wide totals (`snapshot`) are cumulative for the life of the process. A run's
+own figures go to a per-run collector that `track_run` installs in a context variable, so
+runs on different threads (e.g. the daemon's jobs) don't see each other's work; worker
+threads started during a run must call through `bind` to report into it. With metrics
+disabled (`set_enabled(False)` or GW2_METRICS=0) `stage` returns a shared no-op context
+manager and `add` returns immediately.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_enabled = os.environ.get("GW2_METRICS", "1") != "0"
+_lock = threading.Lock()
+_stages = {}  # name -> [calls, seconds]
+_counters = {}  # name -> value
+_NOOP = nullcontext()
+_collectors = contextvars.ContextVar("metrics_collectors", default=())  # per-run [stages, counters]
+
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = enabled
+
+
+def enabled():
+    return _enabled
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            for stages in (_stages, *(collector[0] for collector in _collectors.get())):
+                entry = stages.get(self.name)
+                if entry is None:
+                    stages[self.name] = [1, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+        return False
+
+
+def stage(name):
+    """Context manager timing one call of stage `name`."""
+    return _Stage(name) if _enabled else _NOOP
+
+
+def add(name, value=1):
+    if not _enabled:
+        return
+    with _lock:
+        for counters in (_counters, *(collector[1] for collector in _collectors.get())):
+            counters[name] = counters.get(name, 0) + value
+
+
+def bind(fn):
+    """Wraps `fn` to run in the caller's context, so a worker thread reports into the caller's runs."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+def _snapshot_of(stages, counters):
+    return {
+        "stages": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in stages.items()},
+        "counters": dict(counters),
+    }
+
+
+def snapshot():
+    with _lock:
+        return _snapshot_of(_stages, _counters)
+
+
+def diff(after, before):
+    """The metrics recorded between two snapshots."""
+    stages = {}
+    for name, entry in after["stages"].items():
+        prev = before["stages"].get(name, {"calls": 0, "seconds": 0.0})
+        if entry["calls"] != prev["calls"]:
+            stages[name] = {"calls": entry["calls"] - prev["calls"], "seconds": entry["seconds"] - prev["seconds"]}
+    counters = {name: value - before["counters"].get(name, 0) for name, value in after["counters"].items()
+                if value != before["counters"].get(name, 0)}
+    return {"stages": stages, "counters": counters}
+
+
+def format_summary(snap):
+    lines = [f"{'Stage':<40}{'Calls':>8}{'Total (s)':>12}{'Avg (ms)':>12}"]
+    for name, entry in sorted(snap["stages"].items()):
+        avg = entry["seconds"] / entry["calls"] * 1000 if entry["calls"] else 0.0
+        lines.append(f"{name:<40}{entry['calls']:>8}{entry['seconds']:>12.3f}{avg:>12.1f}")
+    if snap["counters"]:
+        lines.append(f"{'Counter':<40}{'Value':>20}")
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"{name:<40}{value:>20,}")
+    return "\n".join(lines)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus(snap, prefix="gw2_scraper"):
+    """Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+    lines = [f"# TYPE {prefix}_stage_calls_total counter", f"# TYPE {prefix}_stage_seconds_total counter"]
+    for name, entry in sorted(snap["stages"].items()):
+        lines.append(f'{prefix}_stage_calls_total{{stage="{_label(name)}"}} {entry["calls"]}')
+        lines.append(f'{prefix}_stage_seconds_total{{stage="{_label(name)}"}} {entry["seconds"]:.6f}')
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, value in sorted(snap["counters"].items()):
+        lines.append(f'{prefix}_events_total{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write(snap, path):
+    """Writes JSON for a .json path and the Prometheus text format otherwise."""
+    text = json.dumps(snap, indent=2) if path.endswith(".json") else to_prometheus(snap)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def track_run(name, status_callback, path=None):
+    """Times a whole run; afterwards reports what it recorded and optionally writes it to `path`."""
+    if not _enabled:
+        yield
+        return
+    collector = ({}, {})
+    token = _collectors.set(_collectors.get() + (collector,))
+    try:
+        with stage(f"run/{name}"):
+            yield
+    finally:
+        _collectors.reset(token)
+        with _lock:
+            run = _snapshot_of(*collector)
+        status_callback(f"Run metrics:\n{format_summary(run)}")
+        if path:
+            write(run, path)
+
+
+def timed_run(name):
+    """Decorator for run functions taking `status_callback` and `metrics_path` arguments."""
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            with track_run(name, arguments.get("status_callback") or print, arguments.get("metrics_path")):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
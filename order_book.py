@@ -0,0 +1,169 @@
+"""Order-book depth from the official /v2/commerce/listings endpoint.
+
+The listings of many items are held as padded (items x price levels) NumPy arrays per side,
+in fill order (buy orders by price descending, sell listings ascending), with cumulative
+quantities and costs, so fill costs and queue positions for a whole batch of items are a
+few array operations instead of a walk over each item's levels.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+import http_client
+import metrics
+from flip_metrics import TP_FEE_MULTIPLIER, numeric_column, optimal_qty, safe_div
+
+LISTINGS_URL = "https://api.guildwars2.com/v2/commerce/listings"
+LISTING_BATCH_SIZE = 200
+LISTING_WORKERS_DEFAULT = 8
+# Columns depth_metrics appends to the scraper-results sheet
+DEPTH_COLUMNS = ["Buy Units Ahead", "Sell Units Ahead", "Depth Optimal Qty", "Avg Instant Buy (g) | Depth Qty"]
+_PRICE_PAD = np.iinfo(np.int64).max
+
+
+class BookSide:
+    """One side of the books of many items: `price`, `cum_qty` and `cum_cost` are (items x depth)
+    int64 arrays in fill order; `levels` is the number of real price levels of each row.
+
+    Padding levels add no units: their cumulative quantity and cost repeat the last real level
+    and their price (0 for buys, int64 max for sells) never matches a queue lookup.
+    """
+
+    def __init__(self, books, descending):
+        self.descending = descending
+        self.levels = np.array([len(book) for book in books], dtype=np.int64)
+        depth = max(1, int(self.levels.max())) if len(books) else 1
+        rows = np.repeat(np.arange(len(books)), self.levels)
+        cols = np.arange(len(rows)) - np.repeat(np.cumsum(self.levels) - self.levels, self.levels)
+        flat = [level for book in books for level in book]
+        price = np.fromiter((level["unit_price"] for level in flat), dtype=np.int64, count=len(flat))
+        qty = np.fromiter((level["quantity"] for level in flat), dtype=np.int64, count=len(flat))
+
+        self.price = np.full((len(books), depth), 0 if descending else _PRICE_PAD, dtype=np.int64)
+        level_qty = np.zeros((len(books), depth), dtype=np.int64)
+        self.price[rows, cols] = price
+        level_qty[rows, cols] = qty
+        # The API sorts both sides, but fill order is what the cumulative arrays rely on
+        order = np.argsort(-self.price if descending else self.price, axis=1, kind="stable")
+        self.price = np.take_along_axis(self.price, order, axis=1)
+        level_qty = np.take_along_axis(level_qty, order, axis=1)
+        self.cum_qty = np.cumsum(level_qty, axis=1)
+        self.cum_cost = np.cumsum(level_qty * self.price, axis=1)
+
+    def _at(self, arr, rows, k):
+        """arr[rows, k - 1], or 0 where k == 0."""
+        return np.where(k > 0, arr[rows, np.maximum(k - 1, 0)], 0)
+
+    def total(self, rows):
+        return self.cum_qty[rows, -1]
+
+    def fill_cost(self, rows, qty):
+        """Copper cost of taking `qty` units off the top of each row's book; NaN where it is too thin."""
+        rows = np.asarray(rows)
+        qty = np.asarray(qty, dtype=np.int64)
+        k = (self.cum_qty[rows] < qty[:, None]).sum(axis=1)  # first level that completes the fill
+        last = np.minimum(k, self.price.shape[1] - 1)
+        cost = self._at(self.cum_cost, rows, k) + (qty - self._at(self.cum_qty, rows, k)) * self.price[rows, last]
+        return np.where(qty > self.total(rows), np.nan, np.where(qty > 0, cost, 0)).astype(float)
+
+    def average_price(self, rows, qty):
+        """Average copper price of filling `qty` units (NaN for zero or unfillable quantities)."""
+        return safe_div(self.fill_cost(rows, qty), np.asarray(qty, dtype=float))
+
+    def units_ahead(self, rows, price):
+        """Units that fill before a new order at copper `price` (same price or better: FIFO)."""
+        rows = np.asarray(rows)
+        price = np.asarray(price, dtype=np.int64)[:, None]
+        better = self.price[rows] >= price if self.descending else self.price[rows] <= price
+        return self._at(self.cum_qty, rows, better.sum(axis=1))
+
+
+class OrderBook:
+    """Buy and sell listings of many items; `rows(ids)` maps item ids to array rows (-1 if unknown)."""
+
+    def __init__(self, listings):
+        listings = [entry for entry in listings if isinstance(entry, dict) and "id" in entry]
+        self.item_ids = np.array([entry["id"] for entry in listings], dtype=np.int64)
+        self._rows = {item_id: row for row, item_id in enumerate(self.item_ids.tolist())}
+        self.buys = BookSide([entry.get("buys") or [] for entry in listings], descending=True)
+        self.sells = BookSide([entry.get("sells") or [] for entry in listings], descending=False)
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def rows(self, item_ids):
+        return np.array([self._rows.get(int(item_id), -1) for item_id in item_ids], dtype=np.int64)
+
+
+def fetch_listing_batch(batch, status_callback):
+    """Fetches /v2/commerce/listings for one batch. Returns the entries ([] on errors)."""
+    try:
+        r = http_client.get(LISTINGS_URL, params={"ids": ",".join(map(str, batch))}, timeout=20,
+                            status_callback=status_callback)
+        if r.status_code == 404:  # none of the ids is listed
+            return []
+        r.raise_for_status()
+        return r.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        status_callback(f"Error fetching listings for {len(batch)} items starting at {batch[0]}: {e}")
+        return []
+
+
+def fetch_order_book(item_ids, status_callback, workers=LISTING_WORKERS_DEFAULT):
+    """Fetches the listings of `item_ids` in concurrent batches and returns them as an OrderBook."""
+    ids = list(dict.fromkeys(int(i) for i in item_ids))
+    batches = [ids[i:i + LISTING_BATCH_SIZE] for i in range(0, len(ids), LISTING_BATCH_SIZE)]
+    status_callback(f"Fetching order books for {len(ids)} items...")
+    fetch = metrics.bind(fetch_listing_batch)
+    with metrics.stage("depth/fetch"), ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        listings = [entry for batch in executor.map(lambda b: fetch(b, status_callback), batches) for entry in batch]
+    with metrics.stage("depth/build"):
+        book = OrderBook(listings)
+    metrics.add("rows/listings", len(book))
+    return book
+
+
+def link_item_ids(links):
+    """Item ids from gw2bltc item links (".../en/item/<id>-<slug>")."""
+    return links.astype(str).str.split('/').str[-1].str.split('-').str[0]
+
+
+def _copper(gold):
+    return np.nan_to_num(np.round(gold * 10000)).astype(np.int64)
+
+
+def depth_metrics(df, book):
+    """Returns a copy of a scraper-results frame with the DEPTH_COLUMNS appended.
+
+    The queue ahead of a buy order at Overcut (g) and a sell listing at Undercut (g) comes from
+    the live book. Depth Optimal Qty is the Optimal Qty formula with the sell queue in place of
+    Offers; when a day's sales clear that queue, every unit sold past it is profitable, so the
+    quantity is at least Sold - queue. It is capped at the daily units that can be bought past
+    the buy queue and sold. Rows of items missing from `book` get NaN.
+    """
+    df = df.copy()
+    rows = book.rows(pd.to_numeric(link_item_ids(df["Item Link"]), errors="coerce").fillna(-1).astype(int))
+    known = rows >= 0
+    overcut = numeric_column(df, "Buy Price (Inst.)") * numeric_column(df, "Overcut (%)")
+    undercut = numeric_column(df, "Sell Price (Inst.)") * numeric_column(df, "Undercut (%)")
+    bought, sold = numeric_column(df, "Bought"), numeric_column(df, "Sold")
+
+    for col in DEPTH_COLUMNS:
+        df[col] = np.nan
+    if not known.any():
+        return df
+    r = rows[known]
+    buy_ahead = book.buys.units_ahead(r, _copper(overcut[known]))
+    sell_ahead = book.sells.units_ahead(r, _copper(undercut[known]))
+    max_flips = np.minimum(np.maximum(bought[known] - buy_ahead, 0), sold[known])
+    qty = optimal_qty(sold[known], sell_ahead.astype(float), undercut[known], overcut[known], max_flips)
+    profitable = undercut[known] * TP_FEE_MULTIPLIER > overcut[known]
+    qty = np.where(profitable, np.maximum(qty, np.clip(sold[known] - sell_ahead, 0, max_flips)), qty)
+    fill_qty = np.nan_to_num(qty).astype(np.int64)
+    avg_fill = np.where(fill_qty > 0, book.sells.average_price(r, fill_qty) / 10000, np.nan)
+
+    for col, values in zip(DEPTH_COLUMNS, (buy_ahead, sell_ahead, qty, avg_fill)):
+        df.loc[known, col] = values
+    return df
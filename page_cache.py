@@ -0,0 +1,98 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from results_parser import result_table
+
+PAGE_CACHE_MAX_AGE_DAYS_DEFAULT = 7
+
+
+def page_key(params):
+    """Cache key of a search request: its query parameters in a canonical order."""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def table_hash(html):
+    """Hash of the page's result table only, so ads, timestamps and nav changes don't count."""
+    return hashlib.sha1(result_table(html).encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """Local SQLite cache of parsed gw2bltc search pages, keyed by request params.
+
+    Each entry keeps the response's ETag/Last-Modified headers for conditional requests,
+    a hash of its `table.table-result` markup and the parsed item_data rows, so a page that
+    comes back 304 or with an identical table is not parsed again.
+    """
+
+    def __init__(self, path, max_age_days=PAGE_CACHE_MAX_AGE_DAYS_DEFAULT):
+        self.path = path
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                table_hash TEXT NOT NULL,
+                items TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key):
+        """Returns {etag, last_modified, table_hash, items} for a cached page, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, table_hash, items FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, digest, items = row
+        return {"etag": etag, "last_modified": last_modified, "table_hash": digest, "items": json.loads(items)}
+
+    def put(self, key, items, digest, etag=None, last_modified=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, digest, json.dumps(items, separators=(",", ":")), time.time()),
+            )
+            self._conn.commit()
+
+    def revalidate(self, key, etag=None, last_modified=None):
+        """Records a 304 or unchanged table: keeps the rows, refreshes the validators."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), "
+                "fetched_at = ? WHERE key = ?",
+                (etag, last_modified, time.time(), key),
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """Drops pages not seen for max_age_days. Returns the number of entries removed."""
+        cutoff = time.time() - self.max_age_days * 86400
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (cutoff,))
+            self._conn.commit()
+        return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since headers for a cached page (None if it has no validators)."""
+    if entry is None:
+        return None
+    headers = {}
+    if entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers or None
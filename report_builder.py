@@ -0,0 +1,168 @@
+import json
+import os
+
+import numpy as np
+
+ASSET_DIR = "assets"
+TOP_N = 10
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Interactive Report</title>
+    <style>
+        body { background-color: #1a1a1a; color: #f0f0f0; font-family: sans-serif; }
+        h1 { text-align: center; }
+        .grid-container {
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            gap: 20px;
+            padding: 20px;
+        }
+        .grid-item {
+            background-color: #2a2a2a;
+            border-radius: 8px;
+            padding: 15px;
+            min-height: 450px;
+        }
+        .grid-item-span-2 {
+            grid-column: span 2;
+        }
+    </style>
+    __PLOTLY__
+</head>
+<body>
+    <h1>Transaction Analysis Report</h1>
+    <div class="grid-container">
+        <div class="grid-item grid-item-span-2" id="chart-pie"></div>
+        <div class="grid-item" id="chart-profit"></div>
+        <div class="grid-item" id="chart-roi"></div>
+        <div class="grid-item grid-item-span-2" id="chart-timeline"></div>
+        <div class="grid-item grid-item-span-2" id="chart-all"></div>
+    </div>
+    <script type="application/json" id="report-data">__DATA__</script>
+    <script>
+    (function () {
+        const raw = JSON.parse(document.getElementById("report-data").textContent);
+        const items = {
+            name: raw.items.name,
+            profit: Float64Array.from(raw.items.profit),
+            roi: Float64Array.from(raw.items.roi),
+            qty: Float64Array.from(raw.items.qty),
+        };
+        const daily = { date: raw.daily.date, profit: Float64Array.from(raw.daily.profit) };
+        const dark = {
+            paper_bgcolor: "#2a2a2a", plot_bgcolor: "#2a2a2a", font: { color: "#f0f0f0" },
+            xaxis: { gridcolor: "#444" }, yaxis: { gridcolor: "#444" }, height: 450,
+        };
+        const layout = (extra) => Object.assign({}, dark, extra,
+            { xaxis: Object.assign({}, dark.xaxis, extra.xaxis), yaxis: Object.assign({}, dark.yaxis, extra.yaxis) });
+        const config = { responsive: true };
+
+        // Indices of the N largest positive values of a column
+        function top(values, n) {
+            const idx = [];
+            for (let i = 0; i < values.length; i++) if (values[i] > 0) idx.push(i);
+            idx.sort((a, b) => values[b] - values[a]);
+            return idx.slice(0, n);
+        }
+        const pick = (arr, idx) => idx.map((i) => arr[i]);
+
+        const topProfit = top(items.profit, raw.top_n);
+        const topRoi = top(items.roi, raw.top_n);
+
+        Plotly.newPlot("chart-pie", [{
+            type: "pie", hole: 0.3, labels: pick(items.name, topProfit), values: pick(items.profit, topProfit),
+            hovertemplate: "<b>%{label}</b><br>Profit: %{value:.2f}g<br>%{percent}<extra></extra>",
+        }], layout({ title: { text: `Top ${raw.top_n} Profitable Items (by Gold)` } }), config);
+
+        Plotly.newPlot("chart-profit", [{
+            type: "bar", orientation: "h", y: pick(items.name, topProfit), x: pick(items.profit, topProfit),
+            hovertemplate: "<b>%{y}</b><br>Profit: %{x:.2f}g<extra></extra>",
+        }], layout({ title: { text: `Top ${raw.top_n} Items by Profit (Gold)` },
+                     yaxis: { autorange: "reversed" }, xaxis: { title: { text: "Profit (Gold)" } } }), config);
+
+        Plotly.newPlot("chart-roi", [{
+            type: "bar", orientation: "h", y: pick(items.name, topRoi), x: pick(items.roi, topRoi),
+            hovertemplate: "<b>%{y}</b><br>ROI: %{x:.2%}<extra></extra>",
+        }], layout({ title: { text: `Top ${raw.top_n} Items by ROI (%)` },
+                     yaxis: { autorange: "reversed" }, xaxis: { title: { text: "ROI (%)" }, tickformat: ".0%" } }), config);
+
+        const cumulative = new Float64Array(daily.profit.length);
+        daily.profit.reduce((sum, v, i) => (cumulative[i] = sum + v), 0);
+        Plotly.newPlot("chart-timeline", [
+            { type: "bar", name: "Daily P&L", x: daily.date, y: daily.profit,
+              hovertemplate: "%{x}<br>P&L: %{y:.2f}g<extra></extra>" },
+            { type: "scattergl", mode: "lines", name: "Cumulative", x: daily.date, y: cumulative, yaxis: "y2",
+              hovertemplate: "%{x}<br>Cumulative: %{y:.2f}g<extra></extra>" },
+        ], Object.assign(layout({ title: { text: "Realized P&L by Day" }, yaxis: { title: { text: "Gold" } } }),
+            { yaxis2: { overlaying: "y", side: "right", showgrid: false, title: { text: "Cumulative (Gold)" } } }), config);
+
+        Plotly.newPlot("chart-all", [{
+            type: "scattergl", mode: "markers", x: items.profit, y: items.roi, text: items.name,
+            marker: { size: 6, opacity: 0.7, color: items.qty, colorscale: "Viridis", showscale: true,
+                      colorbar: { title: { text: "Qty" } } },
+            hovertemplate: "<b>%{text}</b><br>Profit: %{x:.2f}g<br>ROI: %{y:.2%}<extra></extra>",
+        }], layout({ title: { text: `All ${items.name.length} Items: Profit vs ROI` },
+                     xaxis: { title: { text: "Profit (Gold)" } }, yaxis: { title: { text: "ROI (%)" }, tickformat: ".0%" } }), config);
+    })();
+    </script>
+</body>
+</html>
+"""
+
+
+def ensure_plotly_bundle(output_dir):
+    """Writes plotly.min.js once to `<output_dir>/assets/` and returns its path relative to output_dir."""
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    rel_path = f"{ASSET_DIR}/plotly-{get_plotlyjs_version()}.min.js"
+    path = os.path.join(output_dir, ASSET_DIR, os.path.basename(rel_path))
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp_path, path)
+    return rel_path
+
+
+def _column(values, decimals):
+    return np.round(np.nan_to_num(np.asarray(values, dtype=float)), decimals).tolist()
+
+
+def report_data(df, daily, profit_col, roi_col, qty_col="Sold Qty"):
+    """The single data block every chart reads from: columnar items plus the daily P&L series (gold)."""
+    dates = list(daily or {})
+    return {
+        "top_n": TOP_N,
+        "items": {
+            "name": df["Item Name"].astype(str).tolist(),
+            "profit": _column(df[profit_col], 4),
+            "roi": _column(df[roi_col], 4),
+            "qty": _column(df[qty_col], 0),
+        },
+        "daily": {"date": dates, "profit": _column([daily[d] / 10000 for d in dates], 4)},
+    }
+
+
+def build_report(df, daily, output_dir, profit_col="ROI (g.s)", roi_col="ROI (%)", inline=False):
+    """Writes interactive_report.html and returns its path.
+
+    plotly.js is loaded once from a locally cached copy in `assets/` (or embedded when
+    `inline` is set, for a single self-contained file), so the report works offline.
+    """
+    if inline:
+        from plotly.offline import get_plotlyjs
+        plotly_tag = f"<script>{get_plotlyjs()}</script>"
+    else:
+        plotly_tag = f'<script src="{ensure_plotly_bundle(output_dir)}"></script>'
+    data = json.dumps(report_data(df, daily, profit_col, roi_col), separators=(",", ":")).replace("</", "<\\/")
+    # plotly.js itself contains neither placeholder, so the order of these replacements is safe
+    html = _PAGE.replace("__DATA__", data).replace("__PLOTLY__", plotly_tag)
+
+    report_html_path = os.path.join(output_dir, "interactive_report.html")
+    with open(report_html_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return report_html_path
@@ -0,0 +1,139 @@
+import re
+from html.parser import HTMLParser
+
+# Start of the first <table> carrying the table-result class; everything before it is skipped
+_RESULT_TABLE_RE = re.compile(r"""<table\b[^>]*\bclass\s*=\s*["']?[^"'>]*\btable-result\b""", re.IGNORECASE)
+
+
+class _Cell:
+    __slots__ = ("text", "href", "coins")
+
+    def __init__(self):
+        self.text = []
+        self.href = None
+        self.coins = []  # [class, text] of each cur-t1c/cur-t1b span, in document order
+
+
+class ResultsTableParser(HTMLParser):
+    """Event-driven parser that only collects the <td> cells of `table.table-result` rows.
+
+    Mirrors what `scraper.parse_page` reads through BeautifulSoup: the stripped text of
+    each cell, the first link in the cell and the `cur-t1c`/`cur-t1b` (gold/silver) spans.
+    It expects a well-formed results table; use the BeautifulSoup parser for anything else.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._table_depth = 0      # nesting depth inside a result table
+        self._row = None
+        self._cell = None
+        self._spans = []           # (coin entry index or None, text parts) for each open span
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif "table-result" in (dict(attrs).get("class") or "").split():
+                self._table_depth = 1
+            return
+        if not self._table_depth:
+            return
+        if tag == "tr":
+            self._row = []
+            self.rows.append(self._row)
+        elif tag == "td" and self._row is not None:
+            self._cell = _Cell()
+            self._spans = []
+            self._row.append(self._cell)
+        elif self._cell is not None:
+            if tag == "span":
+                classes = (dict(attrs).get("class") or "").split()
+                coin = "cur-t1c" if "cur-t1c" in classes else "cur-t1b" if "cur-t1b" in classes else None
+                index = None
+                if coin:
+                    index = len(self._cell.coins)
+                    self._cell.coins.append([coin, ""])
+                self._spans.append((index, []))
+            elif tag == "a" and self._cell.href is None:
+                for name, value in attrs:
+                    if name == "href":
+                        self._cell.href = value or ""
+                        break
+
+    def handle_endtag(self, tag):
+        if not self._table_depth:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._row = self._cell = None
+        elif tag == "td":
+            self._cell = None
+        elif tag == "tr":
+            self._row = self._cell = None
+        elif tag == "span" and self._spans and self._cell is not None:
+            index, parts = self._spans.pop()
+            if index is not None:
+                self._cell.coins[index][1] = "".join(parts)
+
+    def handle_data(self, data):
+        if self._cell is None:
+            return
+        data = data.strip()
+        if not data:
+            return
+        self._cell.text.append(data)
+        for _, parts in self._spans:
+            parts.append(data)
+
+
+def _cell_int(cell):
+    try:
+        return int("".join(cell.text).replace(",", ""))
+    except ValueError:
+        return 0
+
+
+def _cell_gold_silver(cell):
+    gold = silver = 0
+    for coin, text in cell.coins:
+        if coin == "cur-t1c":
+            gold = int(text.replace(",", "") or 0)
+        else:
+            silver = int(text or 0)
+    return round(gold + silver / 100, 2)
+
+
+def result_table(html):
+    """The `table.table-result` markup of a page (through its last </table>), or "" if there is none."""
+    match = _RESULT_TABLE_RE.search(html)
+    if not match:
+        return ""
+    end = html.rfind("</table>")
+    return html[match.start():end + len("</table>")] if end > match.start() else html[match.start():]
+
+
+def parse_results_page(html):
+    """Fast equivalent of `scraper.parse_page`: returns the page's item_data dicts."""
+    table = result_table(html)
+    if not table:
+        return []
+    parser = ResultsTableParser()
+    parser.feed(table)
+    parser.close()
+
+    page_items = []
+    for cols in parser.rows[1:]:
+        if len(cols) < 12: continue
+        if cols[1].href is None: continue
+        item_link = f"https://www.gw2bltc.com{cols[1].href}"
+        item_id = item_link.split('/')[-1].split('-')[0]
+        page_items.append({
+            "item_id": item_id, "item_name": "".join(cols[1].text), "item_link": item_link,
+            "Buy Price (Inst.)": _cell_gold_silver(cols[3]), "Sell Price (Inst.)": _cell_gold_silver(cols[2]),
+            "Demand": _cell_int(cols[7]), "Supply": _cell_int(cols[6]),
+            "Bought": _cell_int(cols[10]), "Sold": _cell_int(cols[8]),
+            "Bids": _cell_int(cols[11]), "Offers": _cell_int(cols[9])
+        })
+    return page_items
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pandas as pd
+
+# Scraped (non-derived) columns kept for every snapshot
+SNAPSHOT_COLUMNS = [
+    "Item Name", "Item Link", "Date of Scrape", "Buy Price (Inst.)", "Sell Price (Inst.)",
+    "Demand", "Supply", "Bought", "Sold", "Bids", "Offers",
+    "Avg Buy Price", "Avg Sell Price", "Std Dev Buy Price", "Std Dev Sell Price",
+]
+_TEXT_COLUMNS = {"Item Name", "Item Link", "Date of Scrape"}
+_INT_COLUMNS = {"Demand", "Supply", "Bought", "Sold", "Bids", "Offers"}
+
+
+class ResultsStore:
+    """Append-only SQLite table holding every scrape snapshot.
+
+    Each `run_scraper` call appends its rows under a new scrape_id, so a run costs
+    O(new rows) no matter how much history has accumulated. Use `load` to pull a
+    snapshot (or a time range) back out as a DataFrame for analysis or Excel export.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        def sql_type(col):
+            return "TEXT" if col in _TEXT_COLUMNS else "INTEGER" if col in _INT_COLUMNS else "REAL"
+        cols = ", ".join(f'"{c}" {sql_type(c)}' for c in SNAPSHOT_COLUMNS)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS scrapes (scrape_id INTEGER NOT NULL, item_id TEXT, {cols})")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scrapes_scrape_id ON scrapes (scrape_id)")
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_scrapes_item_id ON scrapes (item_id, "Date of Scrape")')
+        self._conn.commit()
+
+    def append(self, df):
+        """Appends the snapshot in `df` and returns its scrape_id."""
+        row = self._conn.execute("SELECT COALESCE(MAX(scrape_id), 0) + 1 FROM scrapes").fetchone()
+        scrape_id = row[0]
+        out = pd.DataFrame({"scrape_id": scrape_id}, index=df.index)
+        out["item_id"] = df["Item Link"].astype(str).str.split('/').str[-1].str.split('-').str[0]
+        for col in SNAPSHOT_COLUMNS:
+            values = df[col] if col in df.columns else None
+            if col in _TEXT_COLUMNS:
+                out[col] = values
+            else:
+                out[col] = pd.to_numeric(values, errors='coerce') if values is not None else float('nan')
+        out.to_sql("scrapes", self._conn, if_exists="append", index=False)
+        self._conn.commit()
+        return scrape_id
+
+    def snapshots(self):
+        """Returns one row per scrape: scrape_id, scrape date and row count."""
+        return pd.read_sql_query(
+            'SELECT scrape_id, MIN("Date of Scrape") AS "Date of Scrape", COUNT(*) AS rows '
+            "FROM scrapes GROUP BY scrape_id ORDER BY scrape_id",
+            self._conn,
+        )
+
+    def load(self, scrape_id=None, since=None, item_id=None):
+        """Returns stored rows, restricted to one scrape, a start date ("YYYY-MM-DD HH:MM") and/or an item."""
+        clauses, params = [], []
+        if scrape_id is not None:
+            clauses.append("scrape_id = ?")
+            params.append(scrape_id)
+        if since is not None:
+            clauses.append('"Date of Scrape" >= ?')
+            params.append(since)
+        if item_id is not None:
+            clauses.append("item_id = ?")
+            params.append(str(item_id))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return pd.read_sql_query(f"SELECT * FROM scrapes {where} ORDER BY scrape_id, rowid", self._conn, params=params)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,80 @@
+import queue
+import threading
+import time
+
+
+class CancelToken:
+    """Set by the GUI to ask a running task to stop at its next checkpoint."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class WorkerRunner:
+    """Runs one task on a background thread and hands its output to the GUI through a queue.
+
+    The task's callbacks (`log`, `progress`, `rows`) only enqueue events, so they are safe to
+    call from any thread; the GUI collects them in batches with `drain`. Events are tuples:
+
+      ("log", message)
+      ("progress", stage, done, total, eta_seconds)   total/eta are None when unknown
+      ("rows", rows)
+      ("done", error)                                  error is None on success
+    """
+
+    def __init__(self):
+        self.token = CancelToken()
+        self.events = queue.Queue()
+        self.thread = None
+        self._stage_started = {}
+
+    def log(self, message):
+        self.events.put(("log", message))
+
+    def progress(self, stage, done, total=None):
+        now = time.monotonic()
+        started = self._stage_started.setdefault(stage, now)
+        eta = None
+        if total and done:
+            eta = (now - started) / done * max(total - done, 0)
+        self.events.put(("progress", stage, done, total, eta))
+
+    def rows(self, rows):
+        self.events.put(("rows", rows))
+
+    def start(self, target, *args, **kwargs):
+        """Calls `target(*args, status_callback=self.log, **kwargs)` on a daemon thread."""
+        def run():
+            error = None
+            try:
+                target(*args, status_callback=self.log, **kwargs)
+            except Exception as e:
+                error = e
+                self.log(f"Error: {e}")
+            self.events.put(("done", error))
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.token.cancel()
+
+    def is_alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def drain(self, max_events=1000):
+        """Returns up to `max_events` queued events without blocking."""
+        events = []
+        try:
+            while len(events) < max_events:
+                events.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        return events
@@ -1,18 +1,21 @@
-
-import matplotlib
-matplotlib.use('Agg')
 import os
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta, timezone
 import pandas as pd
-import numpy as np
-from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
-import json
-import time
-from tzlocal import get_localzone
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import argparse
+import http_client
+import metrics
+from history_store import HistoryStore, HISTORY_RETENTION_DAYS_DEFAULT
+from results_parser import parse_results_page
+from page_cache import PageCache, conditional_headers, page_key, table_hash
+from flip_metrics import compute_flip_metrics
+from excel_writer import formula_templates, write_results_workbook
+from results_store import ResultsStore, SNAPSHOT_COLUMNS
+from order_book import depth_metrics, fetch_order_book
 
 # Constants
 BASE_URL = "https://www.gw2bltc.com/en/tp/search"
@@ -30,16 +33,42 @@ DEFAULT_PARAMS = {
 OVERCUT_PCT_DEFAULT = 1.10
 UNDERCUT_PCT_DEFAULT = 0.90
 ROI_TARGET_DEFAULT = 0.10
-
-# get timezone
-try:
-    local_tz = get_localzone()
-except Exception:
-    local_tz = timezone.utc
+DATAWARS_BATCH_SIZE = 50
+DATAWARS_REQUIRED_COLS = [
+    'buy_price_avg', 'sell_price_avg', 'buy_price_max', 'sell_price_min',
+    'buy_listed', 'buy_sold', 'sell_listed', 'sell_sold', 'buy_quantity', 'sell_quantity'
+]
+PAGE_PARSER_DEFAULT = "fast"
+SHARD_KEY = "profit-pct"  # search filter whose <key>-min/<key>-max range is split by --shards
+# Column order of scraper-results.xlsx
+RESULT_COLUMNS = [
+    "Item Name", "Item Link", "Date of Scrape", "Buy Price (Inst.)", "Sell Price (Inst.)",
+    "Demand", "Supply", "Bought", "Sold", "Bids", "Offers",
+    "Avg Buy Price", "Avg Sell Price", "Std Dev Buy Price", "Std Dev Sell Price",
+    "Coefficient of Variation (Buy)", "Coefficient of Variation (Sell)",
+    "Instantaneous Volatility (Buy)", "Instantaneous Volatility (Sell)",
+    "Overcut (%)", "Undercut (%)", "Overcut (g)", "Undercut (g)",
+    "Max Flips / Day", "Bought/Bids", "Sold/Offers",
+    "Buy-Through Rate (%)", "Sell-Through Rate (%)", "Flip-Through Rate (%)",
+    "Optimal Qty", "Dynamic Sell-Through Rate (%)", "E(Sales | Q = Optimal Q)",
+    "E(Profit | Q = Optimal Q)", "Optimal Investment (g)", "E(ROI | Q = Optimal Q)", "Time to Sell (Q Optimal)",
+    "Target ROI", "Optimal Buy Price | Target ROI", "Optimal Qty | Target ROI",
+    "Theoretical Return | Target ROI",
+    "Actual Qty Ordered", "Actual Buy Price", "Actual Sell Price",
+    "Buy Order Placed", "Sell Order Placed", "Sold (manual)"
+]
 
 # --------------------
 # HELPERS
 # --------------------
+def get_local_timezone():
+    # tzlocal is only needed for the log line in run_scraper, so it is imported on first use
+    try:
+        from tzlocal import get_localzone
+        return get_localzone()
+    except Exception:
+        return timezone.utc
+
 def parse_gold_silver(td):
     gold = silver = 0
     for span in td.find_all("span"):
@@ -57,168 +86,487 @@ def parse_int(td):
     except ValueError:
         return 0
     
-def get_datawars_data(item_ids, status_callback, days=7):
-    """Fetches and processes data from the DataWars2 API for multiple item IDs with retry logic."""
+def summarize_datawars_history(data, item_ids):
+    """Aggregates a DataWars2 history response into per-item statistics with a single groupby."""
+    df = pd.DataFrame(data)
+    for col in DATAWARS_REQUIRED_COLS:
+        if col not in df.columns:
+            df[col] = 0
+    df[DATAWARS_REQUIRED_COLS] = df[DATAWARS_REQUIRED_COLS].apply(pd.to_numeric, errors='coerce').fillna(0)
+    df['itemID'] = df['itemID'].astype(str)
+    # Averages and standard deviations only consider hours with a positive price
+    df['buy_price_pos'] = df['buy_price_avg'].where(df['buy_price_avg'] > 0)
+    df['sell_price_pos'] = df['sell_price_avg'].where(df['sell_price_avg'] > 0)
+
+    stats = df.groupby('itemID', sort=False).agg(
+        buy_price_sum=('buy_price_avg', 'sum'), sell_price_sum=('sell_price_avg', 'sum'),
+        avg_buy=('buy_price_pos', 'mean'), avg_sell=('sell_price_pos', 'mean'),
+        std_buy=('buy_price_pos', 'std'), std_sell=('sell_price_pos', 'std'),
+        buy_inst=('buy_price_max', 'last'), sell_inst=('sell_price_min', 'last'),
+        demand=('buy_quantity', 'mean'), supply=('sell_quantity', 'mean'),
+        bought=('buy_sold', 'sum'), sold=('sell_sold', 'sum'),
+        bids=('buy_listed', 'sum'), offers=('sell_listed', 'sum'),
+    )
+    stats = stats[(stats['buy_price_sum'] != 0) & (stats['sell_price_sum'] != 0)]
+    stats = stats.to_dict('index')
+
+    results = {}
+    for item_id in item_ids:
+        s = stats.get(item_id)
+        if s is None:
+            results[item_id] = None
+            continue
+        results[item_id] = {
+            "Buy Price (Inst.)": s['buy_inst'] / 10000,
+            "Sell Price (Inst.)": s['sell_inst'] / 10000,
+            "Demand": int(s['demand']),
+            "Supply": int(s['supply']),
+            "Bought": int(s['bought']),
+            "Sold": int(s['sold']),
+            "Bids": int(s['bids']),
+            "Offers": int(s['offers']),
+            "Avg Buy Price": s['avg_buy'] / 10000,
+            "Avg Sell Price": s['avg_sell'] / 10000,
+            "Std Dev Buy Price": s['std_buy'] / 10000,
+            "Std Dev Sell Price": s['std_sell'] / 10000,
+        }
+    return results
+
+def describe_batch(item_ids):
+    """Short log form of an item id batch, e.g. "50 items (19700..24615)"."""
+    if len(item_ids) == 1:
+        return f"item {item_ids[0]}"
+    return f"{len(item_ids)} items ({item_ids[0]}..{item_ids[-1]})"
+
+def get_datawars_data(item_ids, status_callback, days=7, store=None):
+    """Fetches and processes data from the DataWars2 API for multiple item IDs.
+
+    When a HistoryStore already covers the whole window for every item, only the tail from the
+    hour in which that coverage ends is requested (that hour's sample was still incomplete);
+    otherwise the full window is fetched. The statistics are computed from the merged local series.
+    """
     end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=days)
+    fetch_start = start_date
+    if store is not None:
+        covered = store.coverage(item_ids)
+        if len(covered) == len(item_ids) and all(start <= start_date for start, _ in covered.values()):
+            # Samples are dated at the top of their hour, so the hour in progress at the last fetch is fetched again
+            last_hour = min(end for _, end in covered.values()).replace(minute=0, second=0, microsecond=0)
+            fetch_start = max(start_date, last_hour)
     params = {
         "itemID": ",".join(item_ids),
-        "start": start_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "start": fetch_start.strftime('%Y-%m-%dT%H:%M:%SZ'),
         "end": end_date.strftime('%Y-%m-%dT%H:%M:%SZ')
     }
 
-    retries = 3
-    backoff_factor = 0.5
-    for i in range(retries):
-        try:
-            status_callback(f"Fetching DataWars2 data for items: {item_ids}")
-            r = requests.get(DATAWARS_API_URL, params=params, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-            if not data:
-                return {}
-
-            # Verification check
-            returned_item_ids = {str(d['itemID']) for d in data}
-            if len(returned_item_ids) != len(item_ids):
-                status_callback(f"Warning: Requested {len(item_ids)} items, but received data for {len(returned_item_ids)}.")
-
-            results = {}
-            for item_id in item_ids:
-                item_data = [d for d in data if str(d['itemID']) == item_id]
-                if not item_data:
-                    results[item_id] = None
-                    continue
-
-                df = pd.DataFrame(item_data)
-                required_cols = ['buy_price_avg','sell_price_avg','buy_price_max', 'sell_price_min', 'buy_listed', 'buy_sold', 'sell_listed', 'sell_sold', 'buy_quantity', 'sell_quantity']
-                for col in required_cols:
-                    if col not in df.columns:
-                        df[col] = 0
-                for col in required_cols:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-                if df.empty or df['buy_price_avg'].sum() == 0 or df['sell_price_avg'].sum() == 0:
-                    results[item_id] = None
-                    continue
-                
-                # New calculations
-                avg_buy_price = df[df['buy_price_avg'] > 0]['buy_price_avg'].mean() / 10000
-                avg_sell_price = df[df['sell_price_avg'] > 0]['sell_price_avg'].mean() / 10000
-                std_dev_buy_price = df[df['buy_price_avg'] > 0]['buy_price_avg'].std() / 10000
-                std_dev_sell_price = df[df['sell_price_avg'] > 0]['sell_price_avg'].std() / 10000
-
-                # Instantaneous prices
-                buy_price_inst = (df['buy_price_max'].iloc[-1] / 10000) if not df.empty else 0
-                sell_price_inst = (df['sell_price_min'].iloc[-1] / 10000) if not df.empty else 0
-
-                results[item_id] = {
-                    "Buy Price (Inst.)": buy_price_inst,
-                    "Sell Price (Inst.)": sell_price_inst,
-                    "Demand": int(df['buy_quantity'].mean()),
-                    "Supply": int(df['sell_quantity'].mean()),
-                    "Bought": int(df['buy_sold'].sum()),
-                    "Sold": int(df['sell_sold'].sum()),
-                    "Bids": int(df['buy_listed'].sum()),
-                    "Offers": int(df['sell_listed'].sum()),
-                    "Avg Buy Price": avg_buy_price,
-                    "Avg Sell Price": avg_sell_price,
-                    "Std Dev Buy Price": std_dev_buy_price,
-                    "Std Dev Sell Price": std_dev_sell_price,
-                }
-            return results
-        except requests.exceptions.RequestException as e:
-            status_callback(f"Failed to get data for items {item_ids}: {e}. Retrying ({i+1}/{retries})...")
-            time.sleep(backoff_factor * (2 ** i))
-        except (ValueError, KeyError) as e:
-            status_callback(f"Failed to parse data for items {item_ids}: {e}")
+    try:
+        status_callback(f"Fetching DataWars2 data for {describe_batch(item_ids)}")
+        r = http_client.get(DATAWARS_API_URL, params=params, timeout=10, status_callback=status_callback)
+        r.raise_for_status()
+        data = r.json()
+        if store is not None:
+            store.add(data or [])
+            store.mark_fetched(item_ids, fetch_start, end_date)
+            data = store.load(item_ids, start_date)
+        if not data:
             return {}
-    status_callback(f"Failed to get data for items {item_ids} after {retries} retries.")
-    return {}
 
+        # Verification check
+        returned_item_ids = {str(d['itemID']) for d in data}
+        if len(returned_item_ids) != len(item_ids):
+            status_callback(f"Warning: Requested {len(item_ids)} items, but received data for {len(returned_item_ids)}.")
+
+        metrics.add("rows/datawars", len(data))
+        with metrics.stage("datawars/aggregate"):
+            return summarize_datawars_history(data, item_ids)
+    except requests.exceptions.RequestException as e:
+        status_callback(f"Failed to get data for {describe_batch(item_ids)}: {e}")
+        return {}
+    except (ValueError, KeyError) as e:
+        status_callback(f"Failed to parse data for {describe_batch(item_ids)}: {e}")
+        return {}
+
+
+def parse_page(html, parser=PAGE_PARSER_DEFAULT):
+    """Parses a gw2bltc search results page into a list of item_data dicts.
+
+    `parser` is "fast" for the streaming results_parser backend or "soup" for BeautifulSoup.
+    """
+    if parser == "fast":
+        return parse_results_page(html)
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    rows = soup.select("table.table-result tr")[1:]
+    page_items = []
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) < 12: continue
+        item_name = cols[1].get_text(strip=True)
+        link_tag = cols[1].find("a", href=True)
+        item_link = f"https://www.gw2bltc.com{link_tag['href']}" if link_tag else ""
+        if not item_link: continue
+        item_id = item_link.split('/')[-1].split('-')[0]
+        page_items.append({
+            "item_id": item_id, "item_name": item_name, "item_link": item_link,
+            "Buy Price (Inst.)": parse_gold_silver(cols[3]), "Sell Price (Inst.)": parse_gold_silver(cols[2]),
+            "Demand": parse_int(cols[7]), "Supply": parse_int(cols[6]),
+            "Bought": parse_int(cols[10]), "Sold": parse_int(cols[8]),
+            "Bids": parse_int(cols[11]), "Offers": parse_int(cols[9])
+        })
+    return page_items
+
+def fetch_page(page, status_callback, parser=PAGE_PARSER_DEFAULT, params=None, cache=None):
+    """Fetches and parses one search page of `params` (DEFAULT_PARAMS by default). Returns None if the request failed.
+
+    With a PageCache the request is conditional, and the cached rows are returned without
+    parsing when the server answers 304 or the page's result table hashes the same as before.
+    """
+    params = dict(params or DEFAULT_PARAMS)
+    params["page"] = page
+    status_callback(f"Fetching page {page}...")
+    key = page_key(params) if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+    try:
+        r = http_client.get(BASE_URL, params=params, headers=conditional_headers(cached), timeout=20,
+                            status_callback=status_callback)
+        if r.status_code == 304 and cached is not None:
+            cache.revalidate(key, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+            metrics.add("pages/not_modified")
+            return cached["items"]
+        r.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        status_callback(f"Request failed: {e}")
+        return None
+    digest = None
+    if cache is not None:
+        digest = table_hash(r.text)
+        if cached is not None and digest == cached["table_hash"]:
+            cache.revalidate(key, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+            metrics.add("pages/unchanged")
+            return cached["items"]
+    with metrics.stage("parse"):
+        page_items = parse_page(r.text, parser)
+    metrics.add("rows/parse", len(page_items))
+    if cache is not None:
+        cache.put(key, page_items, digest, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    return page_items
+
+def find_last_page(status_callback, fetched, parser=PAGE_PARSER_DEFAULT, params=None, cache=None):
+    """Probes ahead (1, 2, 4, 8, ...) and then bisects to find the last non-empty page.
+
+    Every probed page is stored in `fetched` so the crawl does not download it twice. Returns
+    None if a probe failed, since a failed page says nothing about where the results end.
+    """
+    def probe(page):
+        if page not in fetched:
+            fetched[page] = fetch_page(page, status_callback, parser, params, cache)
+        return fetched[page]
+
+    first = probe(1)
+    if not first:
+        return None if first is None else 0
+    lo, hi = 1, 2
+    while True:
+        page_items = probe(hi)
+        if page_items is None:
+            return None
+        if not page_items:
+            break
+        lo, hi = hi, hi * 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        page_items = probe(mid)
+        if page_items is None:
+            return None
+        if page_items:
+            lo = mid
+        else:
+            hi = mid
+    status_callback(f"Found {lo} pages of results.")
+    return lo
+
+def crawl_pages(pages, status_callback, workers=1, parser=PAGE_PARSER_DEFAULT, cancel_token=None,
+                progress_callback=None, params=None, cache=None):
+    """Yields the parsed items of each search page, in page order.
+
+    Stops early once `cancel_token` is cancelled; `progress_callback("pages", done, total)`
+    is called for every page (total is None while the number of pages is unknown). If the
+    last page cannot be probed, the concurrent crawl falls back to the serial one.
+    """
+    def cancelled():
+        return cancel_token is not None and cancel_token.cancelled
+
+    def crawl_serial(fetched):
+        page = 1
+        while True:
+            if cancelled():
+                return
+            if pages > 0 and page > pages:
+                status_callback(f"Reached page limit of {pages}.")
+                return
+            page_items = fetched.get(page)
+            if page_items is None:
+                page_items = fetch_page(page, status_callback, parser, params, cache)
+            if page_items is None:
+                return
+            if not page_items:
+                status_callback("No more pages found.")
+                return
+            if progress_callback is not None:
+                progress_callback("pages", page, pages or None)
+            yield page_items
+            page += 1
+
+    fetched = {}
+    if workers <= 1:
+        yield from crawl_serial(fetched)
+        return
 
-def run_scraper(historical: bool, output_dir: str, days: int = 7, pages: int = 0, status_callback=None):
-    if status_callback is None:
-        status_callback = print
+    last_page = pages if pages > 0 else find_last_page(status_callback, fetched, parser, params, cache)
+    if last_page is None:
+        status_callback("Could not find the last page; crawling the pages one at a time.")
+        yield from crawl_serial(fetched)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            page: executor.submit(metrics.bind(fetch_page), page, status_callback, parser, params, cache)
+            for page in range(1, last_page + 1) if page not in fetched
+        }
+        for page in range(1, last_page + 1):
+            if cancelled():
+                page_items = None
+            else:
+                page_items = fetched[page] if page in fetched else futures[page].result()
+            if not page_items:
+                if page_items is not None:
+                    status_callback("No more pages found.")
+                for future in futures.values():
+                    future.cancel()
+                return
+            if progress_callback is not None:
+                progress_callback("pages", page, last_page)
+            yield page_items
+    if pages > 0:
+        status_callback(f"Reached page limit of {pages}.")
+
+
+def _edge(value):
+    value = round(value, 2)
+    return int(value) if float(value).is_integer() else value
+
+def shard_params(shards, params=None, key=SHARD_KEY, edges=None):
+    """Splits the `<key>-min`..`<key>-max` range of `params` into search queries, highest band first.
+
+    Bands are equal-width unless `edges` are given. Neighbouring bands share their edge so
+    no value falls between them; items on an edge are dropped again when shards are merged.
+    """
+    params = params or DEFAULT_PARAMS
+    if edges is None:
+        lo, hi = params[f"{key}-min"], params[f"{key}-max"]
+        edges = [_edge(lo + (hi - lo) * i / shards) for i in range(shards + 1)]
+    queries = []
+    for band_lo, band_hi in zip(edges, edges[1:]):
+        query = dict(params)
+        query[f"{key}-min"], query[f"{key}-max"] = band_lo, band_hi
+        queries.append(query)
+    return queries[::-1]
+
+def crawl_sharded(queries, pages, status_callback, parser=PAGE_PARSER_DEFAULT, cancel_token=None,
+                  progress_callback=None, key=SHARD_KEY, cache=None):
+    """Crawls every query (see shard_params) on its own thread and yields the merged items.
+
+    Items are deduplicated by item_id. Shards are yielded in query order, each in page order,
+    so the output is deterministic; later shards keep crawling meanwhile and wait in their
+    queues. `pages` limits the pages per shard.
+    """
+    done = object()
+    queues = [queue.Queue() for _ in queries]
+    pages_done = [0]
+    pages_lock = threading.Lock()
+
+    def count_page(stage, page, total):
+        with pages_lock:
+            pages_done[0] += 1
+            progress_callback("pages", pages_done[0], None)
+
+    def crawl(query, out):
+        label = f"{key} {query[f'{key}-min']}-{query[f'{key}-max']}"
+        try:
+            for page_items in crawl_pages(pages, lambda msg: status_callback(f"[{label}] {msg}"), parser=parser,
+                                          cancel_token=cancel_token, params=query, cache=cache,
+                                          progress_callback=count_page if progress_callback is not None else None):
+                out.put(page_items)
+        finally:
+            out.put(done)
+
+    seen = set()
+    duplicates = 0
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = [executor.submit(metrics.bind(crawl), query, out) for query, out in zip(queries, queues)]
+        for out in queues:
+            while True:
+                page_items = out.get()
+                if page_items is done:
+                    break
+                fresh = []
+                for item in page_items:
+                    if item["item_id"] in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(item["item_id"])
+                    fresh.append(item)
+                if fresh:
+                    yield fresh
+        for future in futures:
+            future.result()
+    status_callback(f"Merged {len(queries)} shards: {len(seen)} unique items, {duplicates} duplicates dropped.")
+
+
+def enrich_pipelined(page_stream, status_callback, days=7, workers=2, store=None, cancel_token=None,
+                     progress_callback=None):
+    """Overlaps page scraping with DataWars2 enrichment.
+
+    A producer thread drains `page_stream` into a queue; the items are regrouped into
+    full DATAWARS_BATCH_SIZE batches (crossing page boundaries) and handed to a pool of
+    DataWars2 workers. Returns the items in scrape order and the merged API results.
+
+    No new batches are submitted once `cancel_token` is cancelled. `progress_callback("enrich",
+    done, total)` reports enriched items against the items scraped so far. An exception raised
+    by `page_stream` is re-raised once the submitted batches have finished.
+    """
+    item_queue = queue.Queue(maxsize=DATAWARS_BATCH_SIZE * 4)
+    done = object()
+    failure = []
+    enriched = [0]
+    enriched_lock = threading.Lock()
+
+    def report(count):
+        with enriched_lock:
+            enriched[0] += count
+            progress_callback("enrich", enriched[0], len(items))
+
+    def produce():
+        try:
+            for page_items in page_stream:
+                for item in page_items:
+                    item_queue.put(item)
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            item_queue.put(done)
+
+    producer = threading.Thread(target=metrics.bind(produce), daemon=True)
+    producer.start()
+
+    items = []
+    futures = []
+    batch = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while True:
+            item = item_queue.get()
+            if item is not done:
+                items.append(item)
+                batch.append(item["item_id"])
+            if batch and (item is done or len(batch) == DATAWARS_BATCH_SIZE):
+                if cancel_token is None or not cancel_token.cancelled:
+                    future = executor.submit(metrics.bind(get_datawars_data), batch, status_callback, days, store)
+                    if progress_callback is not None:
+                        future.add_done_callback(lambda _, count=len(batch): report(count))
+                    futures.append(future)
+                batch = []
+            if item is done:
+                break
+        api_data_dict = {}
+        for future in futures:
+            api_data_dict.update(future.result())
+    producer.join()
+    if failure:
+        raise failure[0]
+    return items, api_data_dict
+
+
+def results_frame(df, existing_df=None):
+    """Lays out a scrape snapshot in RESULT_COLUMNS order with the default inputs filled in,
+    after the carried-over rows of `existing_df`."""
+    df = df.copy()
+    for col in RESULT_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
 
-    os.makedirs(output_dir, exist_ok=True)
-    input_file = os.path.join(output_dir, "scraper-results.xlsx")
-    output_file = os.path.join(output_dir, "scraper-results-new.xlsx")
+    df["Overcut (%)"] = OVERCUT_PCT_DEFAULT
+    df["Undercut (%)"] = UNDERCUT_PCT_DEFAULT
+    df["Target ROI"] = ROI_TARGET_DEFAULT
+    df["Buy Order Placed"] = False
+    df["Sell Order Placed"] = False
+    df["Sold (manual)"] = False
 
-    status_callback(f"Your local timezone is: {local_tz}")
+    if existing_df is None:
+        existing_df = pd.DataFrame()
+    for col in RESULT_COLUMNS:
+        if col not in existing_df.columns:
+            existing_df[col] = ""
 
-    all_rows = []
-    params = DEFAULT_PARAMS.copy()
-    scrape_time_str = datetime.now().strftime("%Y-%m-%d %H:%M")
+    return pd.concat([existing_df[RESULT_COLUMNS], df[RESULT_COLUMNS]], ignore_index=True)
 
-    while True:
-        if pages > 0 and params['page'] > pages:
-            status_callback(f"Reached page limit of {pages}.")
-            break
-        status_callback(f"Fetching page {params['page']}...")
-        try:
-            r = requests.get(BASE_URL, params=params, timeout=20)
-            r.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            status_callback(f"Request failed: {e}")
-            break
 
-        soup = BeautifulSoup(r.text, "html.parser")
-        rows = soup.select("table.table-result tr")[1:]
-        if not rows:
-            status_callback("No more pages found.")
-            break
+def tap_pages(page_stream, callback):
+    """Passes each page's items to `callback` as they stream through."""
+    for page_items in page_stream:
+        callback(page_items)
+        yield page_items
 
-        page_items = []
-        page_item_ids = []
-        for row in rows:
-            cols = row.find_all("td")
-            if len(cols) < 12: continue
-            item_name = cols[1].get_text(strip=True)
-            link_tag = cols[1].find("a", href=True)
-            item_link = f"https://www.gw2bltc.com{link_tag['href']}" if link_tag else ""
-            if not item_link: continue
-            item_id = item_link.split('/')[-1].split('-')[0]
-            item_data = {
-                "item_id": item_id, "item_name": item_name, "item_link": item_link,
-                "Buy Price (Inst.)": parse_gold_silver(cols[3]), "Sell Price (Inst.)": parse_gold_silver(cols[2]),
-                "Demand": parse_int(cols[7]), "Supply": parse_int(cols[6]),
-                "Bought": parse_int(cols[10]), "Sold": parse_int(cols[8]),
-                "Bids": parse_int(cols[11]), "Offers": parse_int(cols[9])
-            }
-            page_items.append(item_data)
-            page_item_ids.append(item_id)
-
-        for i in range(0, len(page_item_ids), 50):
-            batch_ids = page_item_ids[i:i+50]
-            batch_items = page_items[i:i+50]
-            api_data_dict = get_datawars_data(batch_ids, status_callback, days=days) if historical else {item["item_id"]: None for item in batch_items}
-
-            for item_data in batch_items:
-                api_data = api_data_dict.get(item_data["item_id"])
-                row_data = [
-                    item_data["item_name"], item_data["item_link"], scrape_time_str,
-                    item_data["Buy Price (Inst.)"], item_data["Sell Price (Inst.)"],
-                    item_data['Demand'], item_data['Supply'], item_data['Bought'], item_data['Sold'],
-                    item_data['Bids'], item_data['Offers']
-                ]
-                if api_data:
-                    row_data.extend([
-                        api_data["Avg Buy Price"], api_data["Avg Sell Price"],
-                        api_data["Std Dev Buy Price"], api_data["Std Dev Sell Price"],
-                        '', '', '', ''
-                    ])
-                else:
-                    row_data.extend(['', '', '', '', '', '', '', ''])
-                all_rows.append(row_data)
-        params["page"] += 1
-
-    if not all_rows:
-        status_callback("No data scraped.")
-        return
 
-    status_callback("Scraping complete. Processing data...")
+def snapshot_frame(items, api_data_dict, scrape_time_str):
+    """One snapshot row per scraped item (see parse_page), with the DataWars2 statistics if any."""
+    all_rows = []
+    for item_data in items:
+        api_data = api_data_dict.get(item_data["item_id"])
+        row_data = [
+            item_data["item_name"], item_data["item_link"], scrape_time_str,
+            item_data["Buy Price (Inst.)"], item_data["Sell Price (Inst.)"],
+            item_data['Demand'], item_data['Supply'], item_data['Bought'], item_data['Sold'],
+            item_data['Bids'], item_data['Offers']
+        ]
+        if api_data:
+            row_data.extend([
+                api_data["Avg Buy Price"], api_data["Avg Sell Price"],
+                api_data["Std Dev Buy Price"], api_data["Std Dev Sell Price"],
+                '', '', '', ''
+            ])
+        else:
+            row_data.extend(['', '', '', '', '', '', '', ''])
+        all_rows.append(row_data)
+
+    return pd.DataFrame(all_rows, columns=[
+        "Item Name", "Item Link", "Date of Scrape", "Buy Price (Inst.)", "Sell Price (Inst.)",
+        "Demand", "Supply", "Bought", "Sold", "Bids", "Offers",
+        "Avg Buy Price", "Avg Sell Price", "Std Dev Buy Price", "Std Dev Sell Price",
+        "Coefficient of Variation (Buy)", "Coefficient of Variation (Sell)",
+        "Instantaneous Volatility (Buy)", "Instantaneous Volatility (Sell)"
+    ])
+
+
+def save_results(df, output_dir, status_callback, formulas=False, excel=True, book=None):
+    """Appends a snapshot to scraper-history.sqlite and exports it to scraper-results-new.xlsx,
+    carrying over the rows marked as ordered in scraper-results.xlsx. With an OrderBook the
+    export also gets the order_book.DEPTH_COLUMNS."""
+    input_file = os.path.join(output_dir, "scraper-results.xlsx")
+    output_file = os.path.join(output_dir, "scraper-results-new.xlsx")
 
+    store = ResultsStore(os.path.join(output_dir, "scraper-history.sqlite"))
+    try:
+        with metrics.stage("store/append"):
+            scrape_id = store.append(df)
+        status_callback(f"Appended {len(df)} rows to {store.path} (scrape {scrape_id}).")
+        if not excel:
+            return
+        # The Excel file is an export view of the latest snapshot in the store
+        df = store.load(scrape_id=scrape_id)[SNAPSHOT_COLUMNS]
+    finally:
+        store.close()
+
+    # Carry over rows the user marked as ordered in the previous export
     if os.path.exists(input_file):
         try:
             existing_df = pd.read_excel(input_file, sheet_name='scraper-results')
@@ -229,139 +577,104 @@ def run_scraper(historical: bool, output_dir: str, days: int = 7, pages: int = 0
     else:
         existing_df = pd.DataFrame()
 
-    df = pd.DataFrame(all_rows, columns=[
-        "Item Name", "Item Link", "Date of Scrape", "Buy Price (Inst.)", "Sell Price (Inst.)",
-        "Demand", "Supply", "Bought", "Sold", "Bids", "Offers",
-        "Avg Buy Price", "Avg Sell Price", "Std Dev Buy Price", "Std Dev Sell Price",
-        "Coefficient of Variation (Buy)", "Coefficient of Variation (Sell)",
-        "Instantaneous Volatility (Buy)", "Instantaneous Volatility (Sell)"
-    ])
+    combined_df = results_frame(df, existing_df)
+    if not formulas:
+        with metrics.stage("excel/metrics"):
+            combined_df = compute_flip_metrics(combined_df)
+    if book is not None:
+        with metrics.stage("depth/metrics"):
+            combined_df = depth_metrics(combined_df, book)
+    status_callback("Writing Excel file...")
+    formula_map = None
+    if formulas:
+        header_to_idx = {name: idx for idx, name in enumerate(RESULT_COLUMNS, start=1)}
+        def L(name): return get_column_letter(header_to_idx.get(name))
+        formula_map = formula_templates(L, ROI_TARGET_DEFAULT)
+    with metrics.stage("excel/write"):
+        write_results_workbook(combined_df, output_file, formulas=formula_map)
+    metrics.add("rows/excel", len(combined_df))
+    status_callback(f"Success! Final workbook saved to {output_file}.")
 
-    final_column_order = [
-        "Item Name", "Item Link", "Date of Scrape", "Buy Price (Inst.)", "Sell Price (Inst.)",
-        "Demand", "Supply", "Bought", "Sold", "Bids", "Offers",
-        "Avg Buy Price", "Avg Sell Price", "Std Dev Buy Price", "Std Dev Sell Price",
-        "Coefficient of Variation (Buy)", "Coefficient of Variation (Sell)",
-        "Instantaneous Volatility (Buy)", "Instantaneous Volatility (Sell)",
-        "Overcut (%)", "Undercut (%)", "Overcut (g)", "Undercut (g)",
-        "Max Flips / Day", "Bought/Bids", "Sold/Offers",
-        "Buy-Through Rate (%)", "Sell-Through Rate (%)", "Flip-Through Rate (%)",
-        "Optimal Qty", "Dynamic Sell-Through Rate (%)", "E(Sales | Q = Optimal Q)",
-        "E(Profit | Q = Optimal Q)", "Optimal Investment (g)", "E(ROI | Q = Optimal Q)", "Time to Sell (Q Optimal)",
-        "Target ROI", "Optimal Buy Price | Target ROI", "Optimal Qty | Target ROI",
-        "Theoretical Return | Target ROI",
-        "Actual Qty Ordered", "Actual Buy Price", "Actual Sell Price",
-        "Buy Order Placed", "Sell Order Placed", "Sold (manual)"
-    ]
-
-    for col in final_column_order:
-        if col not in df.columns:
-            df[col] = ""
 
-    df["Overcut (%)"] = OVERCUT_PCT_DEFAULT
-    df["Undercut (%)"] = UNDERCUT_PCT_DEFAULT
-    df["Target ROI"] = ROI_TARGET_DEFAULT
-    df["Buy Order Placed"] = False
-    df["Sell Order Placed"] = False
-    df["Sold (manual)"] = False
 
-    for col in final_column_order:
-        if col not in existing_df.columns:
-            existing_df[col] = ""
+@metrics.timed_run("scraper")
+def run_scraper(historical: bool, output_dir: str, days: int = 7, pages: int = 0, status_callback=None, workers: int = 1, datawars_workers: int = 2,
+                history_cache: bool = True, history_retention_days: int = HISTORY_RETENTION_DAYS_DEFAULT,
+                parser: str = PAGE_PARSER_DEFAULT, formulas: bool = False, excel: bool = True,
+                cancel_token=None, progress_callback=None, row_callback=None, metrics_path=None, shards: int = 1,
+                page_cache: bool = True, depth: bool = False):
+    """Scrapes gw2bltc (optionally enriched with DataWars2 history) and saves the results.
 
-    combined_df = pd.concat([existing_df[final_column_order], df[final_column_order]], ignore_index=True)
-    combined_df.to_excel(output_file, index=False)
-
-    status_callback("Formatting Excel file...")
-
-    wb = load_workbook(output_file)
-    ws = wb.active
-    ws.title = "scraper-results"
-    ws.freeze_panes = 'B2'
-
-    header_to_idx = {str(cell.value).strip(): idx for idx, cell in enumerate(ws[1], start=1)}
-    def L(name): return get_column_letter(header_to_idx.get(name))
-    max_row = ws.max_row
-
-    for row in range(2, max_row + 1):
-        # Number formats
-        ws[f'{L("Buy Price (Inst.)")}{row}'].number_format = '0.00'
-        ws[f'{L("Sell Price (Inst.)")}{row}'].number_format = '0.00'
-        ws[f'{L("Avg Buy Price")}{row}'].number_format = '0.00'
-        ws[f'{L("Avg Sell Price")}{row}'].number_format = '0.00'
-        ws[f'{L("Std Dev Buy Price")}{row}'].number_format = '0.00'
-        ws[f'{L("Std Dev Sell Price")}{row}'].number_format = '0.00'
-        ws[f'{L("Coefficient of Variation (Buy)")}{row}'].number_format = '0%'
-        ws[f'{L("Coefficient of Variation (Sell)")}{row}'].number_format = '0%'
-        ws[f'{L("Instantaneous Volatility (Buy)")}{row}'].number_format = '0%'
-        ws[f'{L("Instantaneous Volatility (Sell)")}{row}'].number_format = '0%'
-        ws[f'{L("Overcut (%)")}{row}'].number_format = '0%'
-        ws[f'{L("Undercut (%)")}{row}'].number_format = '0%'
-        ws[f'{L("Overcut (g)")}{row}'].number_format = '0.00'
-        ws[f'{L("Undercut (g)")}{row}'].number_format = '0.00'
-        ws[f'{L("Max Flips / Day")}{row}'].number_format = '0'
-        ws[f'{L("Bought/Bids")}{row}'].number_format = '0.00'
-        ws[f'{L("Sold/Offers")}{row}'].number_format = '0.00'
-        ws[f'{L("Buy-Through Rate (%)")}{row}'].number_format = '0%'
-        ws[f'{L("Sell-Through Rate (%)")}{row}'].number_format = '0%'
-        ws[f'{L("Flip-Through Rate (%)")}{row}'].number_format = '0%'
-        ws[f'{L("Optimal Qty")}{row}'].number_format = '0'
-        ws[f'{L("Dynamic Sell-Through Rate (%)")}{row}'].number_format = '0%'
-        ws[f'{L("E(Sales | Q = Optimal Q)")}{row}'].number_format = '0'
-        ws[f'{L("E(Profit | Q = Optimal Q)")}{row}'].number_format = '0.00'
-        ws[f'{L("Optimal Investment (g)")}{row}'].number_format = '0.00'
-        ws[f'{L("E(ROI | Q = Optimal Q)")}{row}'].number_format = '0%'
-        ws[f'{L("Time to Sell (Q Optimal)")}{row}'].number_format = '0.00'
-        ws[f'{L("Actual Qty Ordered")}{row}'].number_format = '0'
-        ws[f'{L("Actual Buy Price")}{row}'].number_format = '0.00'
-
-        # Formatting for new columns
-        ws[f'{L("Target ROI")}{row}'].number_format = '0%'
-        ws[f'{L("Optimal Qty | Target ROI")}{row}'].number_format = '0'
-        ws[f'{L("Optimal Buy Price | Target ROI")}{row}'].number_format = '0.00'
-        ws[f'{L("Theoretical Return | Target ROI")}{row}'].number_format = '0.00'
-
-        for int_col in ["Demand", "Supply", "Bought", "Sold", "Bids", "Offers"]:
-            ws[f'{L(int_col)}{row}'].number_format = '#,##0'
-
-        # Formulas
-        ws[f'{L("Coefficient of Variation (Buy)")}{row}'].value = f'=IFERROR({L("Std Dev Buy Price")}{row}/{L("Avg Buy Price")}{row},0)'
-        ws[f'{L("Coefficient of Variation (Sell)")}{row}'].value = f'=IFERROR({L("Std Dev Sell Price")}{row}/{L("Avg Sell Price")}{row},0)'
-        ws[f'{L("Instantaneous Volatility (Buy)")}{row}'].value = f'=IFERROR(({L("Buy Price (Inst.)")}{row}-{L("Avg Buy Price")}{row})/{L("Avg Buy Price")}{row},0)'
-        ws[f'{L("Instantaneous Volatility (Sell)")}{row}'].value = f'=IFERROR(({L("Sell Price (Inst.)")}{row}-{L("Avg Sell Price")}{row})/{L("Avg Sell Price")}{row},0)'
-        ws[f'{L("Overcut (g)")}{row}'].value = f'={L("Buy Price (Inst.)")}{row}*{L("Overcut (%)")}{row}'
-        ws[f'{L("Undercut (g)")}{row}'].value = f'={L("Sell Price (Inst.)")}{row}*{L("Undercut (%)")}{row}'
-        ws[f'{L("Max Flips / Day")}{row}'].value = f'=MIN({L("Bought")}{row},{L("Sold")}{row})'
-        ws[f'{L("Bought/Bids")}{row}'].value = f'=IFERROR({L("Bought")}{row}/{L("Bids")}{row},"")'
-        ws[f'{L("Sold/Offers")}{row}'].value = f'=IFERROR({L("Sold")}{row}/{L("Offers")}{row},"")'
-        ws[f'{L("Buy-Through Rate (%)")}{row}'].value = f'=IF({L("Bids")}{row}=0,IF({L("Bought")}{row}>0,1,0),MIN(1,{L("Bought")}{row}/{L("Bids")}{row}))'
-        ws[f'{L("Sell-Through Rate (%)")}{row}'].value = f'=IF({L("Offers")}{row}=0,IF({L("Sold")}{row}>0,1,0),MIN(1,{L("Sold")}{row}/{L("Offers")}{row}))'
-        ws[f'{L("Flip-Through Rate (%)")}{row}'].value = f'={L("Buy-Through Rate (%)")}{row}*{L("Sell-Through Rate (%)")}{row}'
-        ws[f'{L("Optimal Qty")}{row}'].value = f'=LET(q,ROUND(SQRT({L("Sold")}{row}*{L("Offers")}{row}*{L("Undercut (g)")}{row}*0.85/{L("Overcut (g)")}{row})-{L("Offers")}{row}),IF(q<0,0,MIN(q,{L("Max Flips / Day")}{row})))'
-        ws[f'{L("Dynamic Sell-Through Rate (%)")}{row}'].value = f'=IFERROR(IF({L("Optimal Qty")}{row}>0,MIN(1,{L("Sold")}{row}/({L("Offers")}{row}+{L("Optimal Qty")}{row})),NA()),"")'
-        ws[f'{L("E(Sales | Q = Optimal Q)")}{row}'].value = f'=ROUND({L("Optimal Qty")}{row}*{L("Dynamic Sell-Through Rate (%)")}{row}, 0)'
-        ws[f'{L("E(Profit | Q = Optimal Q)")}{row}'].value = f'={L("E(Sales | Q = Optimal Q)")}{row}*{L("Undercut (g)")}{row}*0.85-{L("Overcut (g)")}{row}*{L("Optimal Qty")}{row}'
-        ws[f'{L("Optimal Investment (g)")}{row}'].value = f'={L("Optimal Qty")}{row}*{L("Overcut (g)")}{row}'
-        ws[f'{L("E(ROI | Q = Optimal Q)")}{row}'].value = f'=IFERROR({L("E(Profit | Q = Optimal Q)")}{row}/{L("Optimal Investment (g)")}{row},0)'
-        ws[f'{L("Time to Sell (Q Optimal)")}{row}'].value = f'=({L("Offers")}{row} + {L("Optimal Qty")}{row})/{L("Sold")}{row}'
-
-        # New formulas for Target ROI
-        ws[f'{L("Target ROI")}{row}'].value = f'={ROI_TARGET_DEFAULT}'
-        ws[f'{L("Optimal Buy Price | Target ROI")}{row}'].value = f'=IFERROR(({L("Undercut (g)")}{row}*0.85)/(1+{L("Target ROI")}{row}), 0)'
-        ws[f'{L("Optimal Qty | Target ROI")}{row}'].value = f'=IF({L("Optimal Buy Price | Target ROI")}{row} < {L("Buy Price (Inst.)")}{row}, 0, LET(q,ROUND(SQRT({L("Sold")}{row}*{L("Offers")}{row}*{L("Undercut (g)")}{row}*0.85/{L("Optimal Buy Price | Target ROI")}{row}) - {L("Offers")}{row}), IF(q<0,0,MIN(q,{L("Max Flips / Day")}{row}))))'
-        ws[f'{L("Theoretical Return | Target ROI")}{row}'].value = f'=({L("Undercut (g)")}{row}*0.85-{L("Optimal Buy Price | Target ROI")}{row})*{L("Optimal Qty | Target ROI")}{row}'
-
-    ws.auto_filter.ref = ws.dimensions
-    for col_cells in ws.columns:
-        max_length = 0
-        col_letter = get_column_letter(col_cells[0].column)
-        for cell in col_cells:
-            if cell.value is not None:
-                max_length = max(max_length, len(str(cell.value)))
-        ws.column_dimensions[col_letter].width = max(8, max_length + 2)
-
-    wb.save(output_file)
-    status_callback(f"Success! Final workbook saved to {output_file}.")
+    `cancel_token` (runner.CancelToken) stops the run at the next page/batch without saving
+    anything. `progress_callback(stage, done, total)` reports "pages" and "enrich" progress,
+    and `row_callback(items)` receives each page's scraped items as soon as it is parsed.
+    The run's stage timings are logged at the end and written to `metrics_path` if given.
+
+    With `shards` > 1 the search is split into that many profit-percentage bands, crawled in
+    parallel (one thread per shard, `pages` pages at most each) and merged by item_id.
+
+    With `page_cache` result pages are fetched conditionally against page-cache.sqlite and
+    pages whose result table has not changed are not parsed again. With `depth` the scraped
+    items' order books are fetched and depth-aware columns added to the export.
+    """
+    if status_callback is None:
+        status_callback = print
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    status_callback(f"Your local timezone is: {get_local_timezone()}")
+
+    scrape_time_str = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    cache = None
+    if page_cache:
+        cache = PageCache(os.path.join(output_dir, "page-cache.sqlite"))
+        evicted = cache.evict()
+        if evicted:
+            status_callback(f"Evicted {evicted} cached result pages older than {cache.max_age_days} days.")
+    try:
+        if shards > 1:
+            page_stream = crawl_sharded(shard_params(shards), pages, status_callback, parser=parser,
+                                        cancel_token=cancel_token, progress_callback=progress_callback, cache=cache)
+        else:
+            page_stream = crawl_pages(pages, status_callback, workers=workers, parser=parser,
+                                      cancel_token=cancel_token, progress_callback=progress_callback, cache=cache)
+        if row_callback is not None:
+            page_stream = tap_pages(page_stream, row_callback)
+        if historical:
+            store = None
+            if history_cache:
+                store = HistoryStore(os.path.join(output_dir, "datawars-history.sqlite"),
+                                     retention_days=max(history_retention_days, days))
+                evicted = store.evict()
+                if evicted:
+                    status_callback(f"Evicted {evicted} cached DataWars2 samples older than {store.retention_days} days.")
+            try:
+                items, api_data_dict = enrich_pipelined(page_stream, status_callback, days=days,
+                                                        workers=datawars_workers, store=store,
+                                                        cancel_token=cancel_token, progress_callback=progress_callback)
+            finally:
+                if store is not None:
+                    store.close()
+        else:
+            items = [item for page_items in page_stream for item in page_items]
+            api_data_dict = {}
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if cancel_token is not None and cancel_token.cancelled:
+        status_callback(f"Cancelled after {len(items)} items. Nothing was saved.")
+        return
+
+    df = snapshot_frame(items, api_data_dict, scrape_time_str)
+    if df.empty:
+        status_callback("No data scraped.")
+        return
+
+    status_callback("Scraping complete. Processing data...")
+    book = fetch_order_book([item["item_id"] for item in items], status_callback) if depth and excel else None
+    save_results(df, output_dir, status_callback, formulas=formulas, excel=excel, book=book)
 
 
 if __name__ == "__main__":
@@ -370,6 +683,24 @@ if __name__ == "__main__":
     parser.add_argument('--output_dir', type=str, default='.', help='Directory to save the output file')
     parser.add_argument('--days', type=int, default=7, help='Number of days of historical data to query')
     parser.add_argument('--pages', type=int, default=0, help='Number of pages to scrape (0 for all)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of pages to fetch concurrently (1 for a serial crawl)')
+    parser.add_argument('--datawars_workers', type=int, default=2, help='Number of concurrent DataWars2 batch requests when --historical is set')
+    parser.add_argument('--no_history_cache', action='store_true', help='Always fetch the full DataWars2 window instead of using the local history cache')
+    parser.add_argument('--no_page_cache', action='store_true', help='Always download and parse every result page instead of using the local page cache')
+    parser.add_argument('--history_retention_days', type=int, default=HISTORY_RETENTION_DAYS_DEFAULT, help='Days of cached DataWars2 samples to keep')
+    parser.add_argument('--parser', choices=['fast', 'soup'], default=PAGE_PARSER_DEFAULT, help='HTML parser backend for result pages')
+    parser.add_argument('--formulas', action='store_true', help='Write Excel formulas for the derived columns instead of computed values')
+    parser.add_argument('--no_excel', action='store_true', help='Only append to the scrape history store, skip the Excel export')
+    parser.add_argument('--depth', action='store_true', help='Fetch the order books of the results and add depth-aware queue and quantity columns')
+    parser.add_argument('--shards', type=int, default=1, help='Split the search into this many profit-%% bands crawled in parallel (1 for a single query)')
+    parser.add_argument('--metrics_out', type=str, default=None, help='Write run metrics to this file (.json for JSON, otherwise Prometheus text format)')
+    parser.add_argument('--no_metrics', action='store_true', help='Disable stage timing and counters')
     args = parser.parse_args()
 
-    run_scraper(historical=args.historical, output_dir=args.output_dir, days=args.days, pages=args.pages)
\ No newline at end of file
+    if args.no_metrics:
+        metrics.set_enabled(False)
+    run_scraper(historical=args.historical, output_dir=args.output_dir, days=args.days, pages=args.pages,
+                workers=args.workers, datawars_workers=args.datawars_workers,
+                history_cache=not args.no_history_cache, history_retention_days=args.history_retention_days,
+                parser=args.parser, formulas=args.formulas, excel=not args.no_excel, metrics_path=args.metrics_out,
+                shards=args.shards, page_cache=not args.no_page_cache, depth=args.depth)
\ No newline at end of file
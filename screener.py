@@ -0,0 +1,254 @@
+"""Flip screener over the whole trading post, built on the official /v2/commerce/prices endpoint.
+
+Instead of scraping gw2bltc's filtered search, the best buy order and sell listing of every
+tradable item are fetched in 200-id batches and the profit/ROI filters of the search params
+(scraper.DEFAULT_PARAMS) are applied to integer copper arrays at once. Candidates are saved
+in the same snapshot schema as run_scraper (scraper-history.sqlite, scraper-results-new.xlsx).
+
+The prices endpoint has no trade volumes: the sold-day-min/bought-day-min filters and the
+Bought/Sold/Bids/Offers columns come from DataWars2 history when `historical` is set, and
+are skipped/left blank otherwise.
+"""
+import argparse
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import requests
+
+import http_client
+import metrics
+from history_store import HistoryStore, HISTORY_RETENTION_DAYS_DEFAULT
+from item_catalog import ItemCatalog
+from order_book import fetch_order_book
+from scraper import DEFAULT_PARAMS, enrich_pipelined, save_results, snapshot_frame
+from transaction_scraper import get_item_names_async
+
+PRICES_URL = "https://api.guildwars2.com/v2/commerce/prices"
+PRICE_BATCH_SIZE = 200
+PRICE_WORKERS_DEFAULT = 8
+ITEM_LINK = "https://www.gw2bltc.com/en/item/{}"
+# Columns of the price table, all integers (prices in copper)
+PRICE_FIELDS = ["id", "buy", "demand", "sell", "supply"]
+
+
+def fetch_price_ids(status_callback):
+    """Ids of every item listed on the trading post."""
+    r = http_client.get(PRICES_URL, timeout=20, status_callback=status_callback)
+    r.raise_for_status()
+    return r.json()
+
+
+def fetch_price_batch(batch, status_callback):
+    """Fetches /v2/commerce/prices for one batch as an (n, len(PRICE_FIELDS)) int64 array."""
+    try:
+        r = http_client.get(PRICES_URL, params={"ids": ",".join(map(str, batch))}, timeout=20,
+                            status_callback=status_callback)
+        if r.status_code == 404:  # none of the ids is (still) tradable
+            return np.empty((0, len(PRICE_FIELDS)), dtype=np.int64)
+        r.raise_for_status()
+        rows = [(p["id"], p["buys"]["unit_price"], p["buys"]["quantity"], p["sells"]["unit_price"], p["sells"]["quantity"])
+                for p in r.json()]
+    except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+        status_callback(f"Error fetching prices for {len(batch)} items starting at {batch[0]}: {e}")
+        rows = []
+    return np.array(rows, dtype=np.int64).reshape(-1, len(PRICE_FIELDS))
+
+
+def fetch_prices(ids, status_callback, workers=PRICE_WORKERS_DEFAULT, cancel_token=None, progress_callback=None):
+    """Fetches the prices of `ids` in concurrent batches. Returns {field: array} (see PRICE_FIELDS).
+
+    Stops at the next batch once `cancel_token` is cancelled; `progress_callback("prices",
+    done, total)` is called per batch.
+    """
+    batches = [ids[i:i + PRICE_BATCH_SIZE] for i in range(0, len(ids), PRICE_BATCH_SIZE)]
+    chunks = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        fetch = metrics.bind(fetch_price_batch)
+        futures = [executor.submit(fetch, batch, status_callback) for batch in batches]
+        for done, future in enumerate(futures, start=1):
+            if cancel_token is not None and cancel_token.cancelled:
+                for pending in futures:
+                    pending.cancel()
+                break
+            chunks.append(future.result())
+            if progress_callback is not None:
+                progress_callback("prices", done, len(batches))
+    table = np.concatenate(chunks) if chunks else np.empty((0, len(PRICE_FIELDS)), dtype=np.int64)
+    return {field: table[:, i] for i, field in enumerate(PRICE_FIELDS)}
+
+
+def tp_profit(buy, sell):
+    """Copper profit of buying at `buy` and selling at `sell` after the 15% trading post fees."""
+    return sell * 85 // 100 - buy
+
+
+def screen(prices, params=None):
+    """Boolean mask of the items passing the profit-min and profit-pct-min/max filters of `params`."""
+    params = params or DEFAULT_PARAMS
+    buy, sell = prices["buy"], prices["sell"]
+    profit = tp_profit(buy, sell)
+    mask = (buy > 0) & (sell > 0) & (profit >= params.get("profit-min", 0))
+    # ROI in percent without dividing: profit / buy >= pct / 100
+    if "profit-pct-min" in params:
+        mask &= profit * 100 >= params["profit-pct-min"] * buy
+    if "profit-pct-max" in params:
+        mask &= profit * 100 <= params["profit-pct-max"] * buy
+    return mask
+
+
+def _gold(copper):
+    """Copper to gold with silver precision, as the gw2bltc pages show it (see parse_gold_silver)."""
+    return np.round(copper // 100 / 100, 2)
+
+
+def candidate_items(prices, mask, names):
+    """The screened items as parse_page-style dicts, best ROI first."""
+    ids, buy, sell = prices["id"][mask], prices["buy"][mask], prices["sell"][mask]
+    order = np.argsort(-(tp_profit(buy, sell) / buy), kind="stable")
+    columns = zip(ids[order].tolist(), _gold(buy[order]).tolist(), _gold(sell[order]).tolist(),
+                  prices["demand"][mask][order].tolist(), prices["supply"][mask][order].tolist())
+    return [{
+        "item_id": str(item_id), "item_name": names.get(item_id, f"Item {item_id}"),
+        "item_link": ITEM_LINK.format(item_id),
+        "Buy Price (Inst.)": buy_g, "Sell Price (Inst.)": sell_g, "Demand": demand, "Supply": supply,
+        "Bought": "", "Sold": "", "Bids": "", "Offers": "",
+    } for item_id, buy_g, sell_g, demand, supply in columns]
+
+
+def apply_volumes(items, api_data_dict, days, params=None):
+    """Fills in daily Bought/Sold/Bids/Offers from DataWars2 history and applies the
+    sold-day-min/bought-day-min filters. Items without history are dropped."""
+    params = params or DEFAULT_PARAMS
+    kept = []
+    for item in items:
+        api_data = api_data_dict.get(item["item_id"])
+        if not api_data:
+            continue
+        for col in ("Bought", "Sold", "Bids", "Offers"):
+            item[col] = round(api_data[col] / days)
+        if item["Sold"] >= params.get("sold-day-min", 0) and item["Bought"] >= params.get("bought-day-min", 0):
+            kept.append(item)
+    return kept
+
+
+@metrics.timed_run("screener")
+def run_screener(output_dir: str, historical: bool = False, days: int = 7, status_callback=None, params=None,
+                 workers: int = PRICE_WORKERS_DEFAULT, datawars_workers: int = 2, history_cache: bool = True,
+                 history_retention_days: int = HISTORY_RETENTION_DAYS_DEFAULT, item_cache: bool = True,
+                 formulas: bool = False, excel: bool = True, cancel_token=None, progress_callback=None,
+                 metrics_path=None, depth: bool = False):
+    """Screens every trading post item with the search `params` and saves the candidates like run_scraper.
+
+    With `historical` the candidates are enriched with `days` of DataWars2 history, which also
+    supplies the daily volume columns and filters. `cancel_token`, `progress_callback`,
+    `metrics_path` and `depth` work as in run_scraper ("prices" and "enrich" progress stages).
+    """
+    if status_callback is None:
+        status_callback = print
+    params = params or DEFAULT_PARAMS
+
+    def cancelled():
+        if cancel_token is not None and cancel_token.cancelled:
+            status_callback("Cancelled. Nothing was saved.")
+            return True
+        return False
+
+    os.makedirs(output_dir, exist_ok=True)
+    scrape_time_str = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    status_callback("Fetching the list of tradable items...")
+    try:
+        ids = fetch_price_ids(status_callback)
+    except requests.exceptions.RequestException as e:
+        status_callback(f"Request failed: {e}")
+        return
+    status_callback(f"Fetching prices for {len(ids)} items...")
+    with metrics.stage("screener/prices"):
+        prices = fetch_prices(ids, status_callback, workers=workers, cancel_token=cancel_token,
+                              progress_callback=progress_callback)
+    metrics.add("rows/prices", len(prices["id"]))
+    if cancelled():
+        return
+
+    with metrics.stage("screener/filter"):
+        mask = screen(prices, params)
+    candidate_ids = prices["id"][mask].tolist()
+    metrics.add("rows/candidates", len(candidate_ids))
+    status_callback(f"{len(candidate_ids)} of {len(prices['id'])} items pass the profit and ROI filters.")
+    if not candidate_ids:
+        status_callback("No data scraped.")
+        return
+
+    status_callback("Fetching item names...")
+    catalog = ItemCatalog(os.path.join(output_dir, "item-catalog.sqlite")) if item_cache else None
+    try:
+        with metrics.stage("screener/items"):
+            names = asyncio.run(get_item_names_async(candidate_ids, status_callback, catalog))
+    finally:
+        if catalog is not None:
+            catalog.close()
+    items = candidate_items(prices, mask, names)
+
+    api_data_dict = {}
+    if historical:
+        store = None
+        if history_cache:
+            store = HistoryStore(os.path.join(output_dir, "datawars-history.sqlite"),
+                                 retention_days=max(history_retention_days, days))
+        try:
+            items, api_data_dict = enrich_pipelined([items], status_callback, days=days, workers=datawars_workers,
+                                                    store=store, cancel_token=cancel_token,
+                                                    progress_callback=progress_callback)
+        finally:
+            if store is not None:
+                store.close()
+        if cancelled():
+            return
+        items = apply_volumes(items, api_data_dict, days, params)
+        status_callback(f"{len(items)} items pass the sold/bought per day filters.")
+    else:
+        status_callback("Volume filters need DataWars2 history (--historical); skipping them.")
+
+    df = snapshot_frame(items, api_data_dict, scrape_time_str)
+    if df.empty:
+        status_callback("No data scraped.")
+        return
+
+    status_callback("Screening complete. Processing data...")
+    book = fetch_order_book([item["item_id"] for item in items], status_callback) if depth and excel else None
+    save_results(df, output_dir, status_callback, formulas=formulas, excel=excel, book=book)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screen every trading post item using the official GW2 prices API.")
+    parser.add_argument('--historical', action='store_true', help='Query DataWars2 API for historical data (enables the volume filters)')
+    parser.add_argument('--output_dir', type=str, default='.', help='Directory to save the output file')
+    parser.add_argument('--days', type=int, default=7, help='Number of days of historical data to query')
+    parser.add_argument('--workers', type=int, default=PRICE_WORKERS_DEFAULT, help='Number of concurrent price batch requests')
+    parser.add_argument('--datawars_workers', type=int, default=2, help='Number of concurrent DataWars2 batch requests when --historical is set')
+    parser.add_argument('--no_history_cache', action='store_true', help='Always fetch the full DataWars2 window instead of using the local history cache')
+    parser.add_argument('--no_item_cache', action='store_true', help='Always fetch item names instead of using the local item catalog')
+    for key, value in DEFAULT_PARAMS.items():
+        if key.endswith(("-min", "-max")):
+            parser.add_argument(f"--{key.replace('-', '_')}", type=float, default=value, help=f'Search filter {key}')
+    parser.add_argument('--formulas', action='store_true', help='Write Excel formulas for the derived columns instead of computed values')
+    parser.add_argument('--no_excel', action='store_true', help='Only append to the scrape history store, skip the Excel export')
+    parser.add_argument('--depth', action='store_true', help='Fetch the order books of the candidates and add depth-aware queue and quantity columns')
+    parser.add_argument('--metrics_out', type=str, default=None, help='Write run metrics to this file (.json for JSON, otherwise Prometheus text format)')
+    parser.add_argument('--no_metrics', action='store_true', help='Disable stage timing and counters')
+    args = parser.parse_args()
+
+    if args.no_metrics:
+        metrics.set_enabled(False)
+    search_params = dict(DEFAULT_PARAMS)
+    for key in search_params:
+        if key.endswith(("-min", "-max")):
+            search_params[key] = getattr(args, key.replace('-', '_'))
+    run_screener(args.output_dir, historical=args.historical, days=args.days, params=search_params,
+                 workers=args.workers, datawars_workers=args.datawars_workers,
+                 history_cache=not args.no_history_cache, item_cache=not args.no_item_cache,
+                 formulas=args.formulas, excel=not args.no_excel, metrics_path=args.metrics_out,
+                 depth=args.depth)
@@ -1,67 +1,257 @@
 import os
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-import plotly.graph_objects as go
-import plotly.io as pio
 from dotenv import load_dotenv
+import asyncio
+import http_client
+import metrics
+from item_catalog import ItemCatalog, oldest_http_date
+from ledger import API_HISTORY_DAYS, TransactionLedger, ledger_path
+from cost_basis import match_lots
+from report_builder import build_report
+
+TRANSACTIONS_URL = "https://api.guildwars2.com/v2/commerce/transactions/history"
+ITEMS_URL = "https://api.guildwars2.com/v2/items"
+PAGE_SIZE = 200
+ITEM_BATCH_SIZE = 200
+ASYNC_CONCURRENCY = 8  # global cap on in-flight API requests for the async engine
 
 def parse_coins_to_gold_silver(coins):
     gold = coins // 10000
     silver = (coins % 10000) // 100
     return round(gold + silver / 100, 2)
 
-def fetch_all_transactions(endpoint, api_key, status_callback):
+def fetch_transaction_page(endpoint, page, headers, status_callback):
+    r = http_client.get(f"{endpoint}?page={page}&page_size={PAGE_SIZE}", headers=headers, timeout=20,
+                        status_callback=status_callback)
+    r.raise_for_status()
+    return r
+
+def fetch_transaction_history(endpoint, api_key, status_callback):
+    """Fetches every page of `endpoint`, one at a time. Returns (transactions, complete);
+    complete is False if a page failed."""
     headers = {"Authorization": f"Bearer {api_key}"}
     all_tx = []
     page = 0
-    page_size = 200
     while True:
-        url = f"{endpoint}?page={page}&page_size={page_size}"
         try:
-            r = requests.get(url, headers=headers, timeout=20)
-            r.raise_for_status()
-            batch = r.json()
-            if not batch:
-                break
-            all_tx.extend(batch)
-            status_callback(f"Fetched page {page + 1} of transactions from {endpoint.split('/')[-1]}...")
-            if len(batch) < page_size:
-                break
-            page += 1
+            r = fetch_transaction_page(endpoint, page, headers, status_callback)
         except requests.exceptions.RequestException as e:
             status_callback(f"Error fetching page {page} from {endpoint}: {e}")
+            return all_tx, False
+        batch = r.json()
+        if not batch:
+            break
+        all_tx.extend(batch)
+        status_callback(f"Fetched page {page + 1} of transactions from {endpoint.split('/')[-1]}...")
+        # Asking past the last page is a 400, so stop at X-Page-Total
+        if len(batch) < PAGE_SIZE or page + 1 >= int(r.headers.get("X-Page-Total", page + 2)):
             break
-    return all_tx
+        page += 1
+    return all_tx, True
+
+def fetch_all_transactions(endpoint, api_key, status_callback):
+    return fetch_transaction_history(endpoint, api_key, status_callback)[0]
 
 def fetch_transactions(api_key, status_callback):
-    base = "https://api.guildwars2.com/v2/commerce/transactions/history"
     status_callback("Fetching buy transactions...")
-    buys = fetch_all_transactions(f"{base}/buys", api_key, status_callback)
+    buys = fetch_all_transactions(f"{TRANSACTIONS_URL}/buys", api_key, status_callback)
     status_callback("Fetching sell transactions...")
-    sells = fetch_all_transactions(f"{base}/sells", api_key, status_callback)
+    sells = fetch_all_transactions(f"{TRANSACTIONS_URL}/sells", api_key, status_callback)
     return buys, sells
 
-def get_item_names(item_ids, status_callback):
+def fetch_item_batch(batch, status_callback, if_modified_since=None):
+    """Fetches /v2/items for one batch. Returns (items, Last-Modified); items is None on 304 Not Modified."""
+    headers = {"If-Modified-Since": if_modified_since} if if_modified_since else None
+    try:
+        r = http_client.get(ITEMS_URL, params={"ids": ",".join(map(str, batch))}, headers=headers, timeout=20,
+                            status_callback=status_callback)
+        if r.status_code == 304:
+            return None, r.headers.get("Last-Modified")
+        r.raise_for_status()
+        return [item for item in r.json() if isinstance(item, dict) and "id" in item], r.headers.get("Last-Modified")
+    except Exception as e:
+        status_callback(f"Error fetching item names for batch {batch}: {e}")
+        return [], None
+
+def plan_item_requests(ids, catalog=None):
+    """Returns [(batch, If-Modified-Since)] covering the ids that are unknown or stale in `catalog`."""
+    if catalog is None:
+        return [(ids[i:i+ITEM_BATCH_SIZE], None) for i in range(0, len(ids), ITEM_BATCH_SIZE)]
+    missing = catalog.missing(ids)
+    missing_set = set(missing)
+    stale = catalog.stale([iid for iid in ids if iid not in missing_set])
+    plan = [(missing[i:i+ITEM_BATCH_SIZE], None) for i in range(0, len(missing), ITEM_BATCH_SIZE)]
+    for i in range(0, len(stale), ITEM_BATCH_SIZE):
+        chunk = stale[i:i+ITEM_BATCH_SIZE]
+        plan.append(([iid for iid, _ in chunk], oldest_http_date(lm for _, lm in chunk)))
+    return plan
+
+def collect_item_names(ids, plan, results, catalog=None):
+    """Merges fetched batches (and the catalog, if any) into {item_id: name}."""
     names = {}
-    ids = list(set(item_ids))
-    for i in range(0, len(ids), 200):
-        batch = ids[i:i+200]
-        try:
-            r = requests.get("https://api.guildwars2.com/v2/items", params={"ids": ",".join(map(str, batch))}, timeout=20)
-            r.raise_for_status()
-            for item in r.json():
-                if isinstance(item, dict) and "id" in item and "name" in item:
-                    names[item["id"]] = item["name"]
-        except Exception as e:
-            status_callback(f"Error fetching item names for batch {batch}: {e}")
+    for (batch, _), (items, last_modified) in zip(plan, results):
+        if items is None:
+            catalog.touch(batch)
+            continue
+        if catalog is not None:
+            catalog.upsert(items, last_modified)
+        names.update({item["id"]: item["name"] for item in items if "name" in item})
+    if catalog is not None:
+        names.update(catalog.names(ids))
     for iid in ids:
         if iid not in names:
             names[iid] = f"Item {iid}"
     return names
 
+def get_item_names(item_ids, status_callback, catalog=None):
+    ids = list(set(item_ids))
+    plan = plan_item_requests(ids, catalog)
+    results = [fetch_item_batch(batch, status_callback, ims) for batch, ims in plan]
+    return collect_item_names(ids, plan, results, catalog)
+
+# --------------------
+# ASYNC ENGINE
+# --------------------
+async def _run_limited(limit, fn, *args):
+    """Runs a blocking fetch in a worker thread once a slot of the global concurrency cap is free."""
+    async with limit:
+        return await asyncio.to_thread(fn, *args)
+
+async def fetch_transaction_history_async(endpoint, api_key, status_callback, limit):
+    """Reads X-Page-Total from the first page, then fetches every remaining page concurrently.
+    Returns (transactions, complete); complete is False if a page failed."""
+    headers = {"Authorization": f"Bearer {api_key}"}
+    name = endpoint.split('/')[-1]
+    try:
+        first = await _run_limited(limit, fetch_transaction_page, endpoint, 0, headers, status_callback)
+    except requests.exceptions.RequestException as e:
+        status_callback(f"Error fetching page 0 from {endpoint}: {e}")
+        return [], False
+    all_tx = first.json()
+    if not all_tx:
+        return [], True
+    page_total = int(first.headers.get("X-Page-Total", 1))
+    status_callback(f"Fetched page 1 of {page_total} of transactions from {name}...")
+
+    async def fetch_page(page):
+        r = await _run_limited(limit, fetch_transaction_page, endpoint, page, headers, status_callback)
+        status_callback(f"Fetched page {page + 1} of {page_total} of transactions from {name}...")
+        return r.json()
+
+    pages = await asyncio.gather(*(fetch_page(p) for p in range(1, page_total)), return_exceptions=True)
+    complete = True
+    for page, batch in enumerate(pages, start=1):
+        if isinstance(batch, Exception):
+            status_callback(f"Error fetching page {page} from {endpoint}: {batch}")
+            complete = False
+            continue
+        all_tx.extend(batch)
+    return all_tx, complete
+
+async def fetch_all_transactions_async(endpoint, api_key, status_callback, limit):
+    return (await fetch_transaction_history_async(endpoint, api_key, status_callback, limit))[0]
+
+async def fetch_transactions_async(api_key, status_callback):
+    status_callback("Fetching buy and sell transactions...")
+    limit = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    return await asyncio.gather(
+        fetch_all_transactions_async(f"{TRANSACTIONS_URL}/buys", api_key, status_callback, limit),
+        fetch_all_transactions_async(f"{TRANSACTIONS_URL}/sells", api_key, status_callback, limit),
+    )
+
+async def get_item_names_async(item_ids, status_callback, catalog=None):
+    ids = list(set(item_ids))
+    plan = plan_item_requests(ids, catalog)
+    limit = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    results = await asyncio.gather(*(_run_limited(limit, fetch_item_batch, batch, status_callback, ims)
+                                     for batch, ims in plan))
+    return collect_item_names(ids, plan, results, catalog)
+
+def sync_ledger_side(ledger, side, api_key, status_callback, since=None, engine="async"):
+    """Pulls `side` ("buys"/"sells") transactions into the ledger. Returns the number of new transactions stored.
+
+    The side's watermark (see TransactionLedger) is cleared when the sync stores its first new
+    transactions and written back only once it completes, so a sync that fails before storing
+    anything keeps it. With a watermark, pages are read newest first up to the
+    first page made up only of known ids, which joins them to the synced history. Without
+    one (a new ledger or an interrupted sync), or when `since` reaches before it and the API
+    may still hold that range, the side's whole API history is backfilled (all pages at once
+    with the async engine).
+    """
+    endpoint = f"{TRANSACTIONS_URL}/{side}"
+    horizon = datetime.now(timezone.utc) - timedelta(days=API_HISTORY_DAYS)
+    watermark = ledger.watermark(side)
+    cleared = [False]
+
+    def store(fresh):
+        if fresh and not cleared[0]:
+            ledger.set_watermark(side, None)
+            cleared[0] = True
+        ledger.add(side, fresh)
+
+    if watermark is None or (since is not None and since < watermark and watermark > horizon):
+        status_callback(f"Backfilling the {side} ledger from the API's full history...")
+        if engine == "async":
+            limit = asyncio.Semaphore(ASYNC_CONCURRENCY)
+            transactions, complete = asyncio.run(fetch_transaction_history_async(endpoint, api_key, status_callback, limit))
+        else:
+            transactions, complete = fetch_transaction_history(endpoint, api_key, status_callback)
+        known = ledger.known_ids(side, [tx["id"] for tx in transactions])
+        fresh = list({tx["id"]: tx for tx in transactions if tx["id"] not in known}.values())
+        store(fresh)
+        if complete:
+            ledger.set_watermark(side, horizon)
+        return len(fresh)
+
+    headers = {"Authorization": f"Bearer {api_key}"}
+    page = 0
+    added = 0
+    complete = False
+    while True:
+        try:
+            r = fetch_transaction_page(endpoint, page, headers, status_callback)
+        except requests.exceptions.RequestException as e:
+            status_callback(f"Error fetching page {page} from {endpoint}: {e}")
+            break
+        batch = r.json()
+        if not batch:
+            complete = True
+            break
+        known = ledger.known_ids(side, [tx["id"] for tx in batch])
+        fresh = [tx for tx in batch if tx["id"] not in known]
+        store(fresh)
+        added += len(fresh)
+        status_callback(f"Synced page {page + 1} of {side}: {len(fresh)} new transactions.")
+        if not fresh:
+            complete = True
+            break
+        page_total = int(r.headers.get("X-Page-Total", page + 2))
+        if len(batch) < PAGE_SIZE or page + 1 >= page_total:
+            # Read the whole API history without meeting the synced part: what lay in between has expired
+            watermark = max(watermark, horizon)
+            complete = True
+            break
+        page += 1
+    if complete:
+        ledger.set_watermark(side, watermark)
+    return added
+
+def sync_ledger(ledger, api_key, status_callback, since=None, engine="async"):
+    """Syncs both sides of the ledger (concurrently with the async engine) and returns (buys, sells)."""
+    status_callback(f"Syncing transaction ledger {ledger.path}...")
+    if engine == "async":
+        async def sync_both():
+            return await asyncio.gather(*(asyncio.to_thread(sync_ledger_side, ledger, side, api_key, status_callback,
+                                                            since, engine)
+                                          for side in ("buys", "sells")))
+        added = asyncio.run(sync_both())
+    else:
+        added = [sync_ledger_side(ledger, side, api_key, status_callback, since, engine) for side in ("buys", "sells")]
+    status_callback(f"Ledger sync added {added[0]} buys and {added[1]} sells.")
+    return ledger.load("buys"), ledger.load("sells")
+
 def filter_last_n_days(transactions, status_callback, date_field="purchased", n=30):
     cutoff = datetime.now() - timedelta(days=n)
     filtered = []
@@ -110,149 +300,167 @@ def aggregate_transactions(buys, sells):
         agg[iid]["received"] += received
     return {iid: data for iid, data in agg.items() if data["bought_qty"] > 0 and data["sold_qty"] > 0}
 
-def save_profit_report(agg, item_names, output_dir, status_callback):
+def transactions_frame(transactions):
+    """Builds a DataFrame from API transaction dicts (or passes an existing DataFrame through)."""
+    if isinstance(transactions, pd.DataFrame):
+        return transactions
+    return pd.DataFrame(transactions, columns=["id", "item_id", "price", "quantity", "created", "purchased"])
+
+def filter_last_n_days_df(transactions, status_callback, date_field="purchased", n=30):
+    """Vectorized filter_last_n_days: one to_datetime call and a boolean mask. Returns a DataFrame."""
+    df = transactions_frame(transactions)
+    dates = df[date_field].where(df[date_field].notna() & (df[date_field] != ""), df["created"])
+    tx_dates = pd.to_datetime(dates, utc=True, errors="coerce", format="ISO8601")
+    # Same cutoff as filter_last_n_days: the local wall-clock time n days ago, read as UTC
+    cutoff = pd.Timestamp(datetime.now() - timedelta(days=n), tz="UTC")
+    mask = tx_dates >= cutoff
+    kept = int(mask.sum())
+    status_callback(f"Filtered transactions: {kept} kept, {len(df) - kept} discarded.")
+    return df[mask]
+
+def _item_totals(df):
+    """Per-item quantity and copper total, truncating each unit price to whole silver like parse_coins_to_gold_silver."""
+    price = df["price"].astype("int64")
+    quantity = df["quantity"].astype("int64")
+    copper = (price // 100 * 100) * quantity
+    return pd.DataFrame({"item_id": df["item_id"], "qty": quantity, "copper": copper}).groupby("item_id", sort=False).sum()
+
+def aggregate_transactions_df(buys, sells):
+    """Vectorized aggregate_transactions; money stays in integer copper until the returned dict."""
+    bought = _item_totals(transactions_frame(buys))
+    sold = _item_totals(transactions_frame(sells))
+    totals = bought.join(sold, how="inner", lsuffix="_bought", rsuffix="_sold")
+    totals = totals[(totals["qty_bought"] > 0) & (totals["qty_sold"] > 0)]
+    return {
+        int(iid): {"bought_qty": int(row.qty_bought), "spent": row.copper_bought / 10000,
+                   "sold_qty": int(row.qty_sold), "received": row.copper_sold / 10000}
+        for iid, row in zip(totals.index, totals.itertuples(index=False))
+    }
+
+def save_profit_report(agg, item_names, output_dir, status_callback, lots=None, daily=None, inline_plotly=False):
+    """Writes profit-report.xlsx and the interactive report.
+
+    `lots` and `daily` are the outputs of cost_basis.match_lots; when given, the report adds
+    FIFO realized profit, open inventory and holding time, ranks items by realized profit
+    and charts realized P&L per day. `inline_plotly` embeds plotly.js in the HTML instead of
+    loading the cached copy from `assets/`.
+    """
     output_file = os.path.join(output_dir, "profit-report.xlsx")
+    lots = lots or {}
     rows = []
-    for iid, data in agg.items():
+    for iid in list(agg) + [iid for iid in lots if iid not in agg]:
+        data = agg.get(iid, {"bought_qty": 0, "spent": 0, "sold_qty": 0, "received": 0})
         name = item_names.get(iid, f"Item {iid}")
         spent = data["spent"]
         received = data["received"]
         roi = received - spent
         roi_pct = roi / spent if spent else ""
-        rows.append({
+        row = {
             "Item Name": name, "Bought Qty": data["bought_qty"], "Sold Qty": data["sold_qty"],
             "Total Spent (g.s)": spent, "Total Received (g.s)": received,
             "ROI (g.s)": roi, "ROI (%)": roi_pct
-        })
+        }
+        if iid in lots:
+            lot = lots[iid]
+            row.update({
+                "Matched Qty": lot["matched_qty"], "Cost Basis (g.s)": lot["cost"] / 10000,
+                "Net Proceeds (g.s)": lot["proceeds"] / 10000, "Realized Profit (g.s)": lot["profit"] / 10000,
+                "Realized ROI (%)": lot["roi"], "Avg Hold (h)": lot["avg_hold_hours"],
+                "Unmatched Sold Qty": lot["unmatched_qty"],
+                "Open Qty": lot["open_qty"], "Open Cost (g.s)": lot["open_cost"] / 10000,
+                "Open Age (h)": lot["open_age_hours"],
+            })
+        rows.append(row)
     df = pd.DataFrame(rows)
     if df.empty or "ROI (g.s)" not in df.columns:
         status_callback("No transactions to report for the selected period/items.")
         return
 
     df["ROI (%)"] = pd.to_numeric(df["ROI (%)"], errors="coerce").fillna(0)
-    df = df.sort_values("ROI (g.s)", ascending=False)
-    df.to_excel(output_file, index=False)
+    profit_col, roi_col = "ROI (g.s)", "ROI (%)"
+    if lots:
+        profit_col, roi_col = "Realized Profit (g.s)", "Realized ROI (%)"
+        df[[profit_col, roi_col]] = df[[profit_col, roi_col]].fillna(0)
+    df = df.sort_values(profit_col, ascending=False)
+    with metrics.stage("report/xlsx"):
+        df.to_excel(output_file, index=False)
+    metrics.add("rows/report", len(df))
 
     status_callback(f"Profit report saved to {output_file}")
 
-    # --- Analytics Visualizations with Plotly ---
     status_callback("Generating interactive analytics visualizations...")
-
-    # Set Plotly template
-    pio.templates.default = "plotly_dark"
-
-    # Prepare data
-    top_profit_items = df[df["ROI (g.s)"] > 0].sort_values("ROI (g.s)", ascending=False).head(10)
-    top_roi_items = df[df["ROI (%)"] > 0].sort_values("ROI (%)", ascending=False).head(10)
-
-    # Chart 1: Pie Chart for Top Profitable Items
-    fig1 = go.Figure(data=[go.Pie(
-        labels=top_profit_items["Item Name"],
-        values=top_profit_items["ROI (g.s)"],
-        hole=.3,
-        hovertemplate="<b>%{label}</b><br>Profit: %{value:.2f}g<br>%{percent}<extra></extra>"
-    )])
-    fig1.update_layout(title_text="Top 10 Profitable Items (by Gold)", height=450)
-
-    # Chart 2: Bar Chart for Top Items by ROI (Gold)
-    fig2 = go.Figure(go.Bar(
-        y=top_profit_items["Item Name"],
-        x=top_profit_items["ROI (g.s)"],
-        orientation='h',
-        hovertemplate="<b>%{y}</b><br>Profit: %{x:.2f}g<extra></extra>"
-    ))
-    fig2.update_layout(
-        title_text="Top 10 Items by Profit (Gold)",
-        yaxis=dict(autorange="reversed"),
-        xaxis_title="Profit (Gold)",
-        height=450
-    )
-
-    # Chart 3: Bar Chart for Top Items by ROI (%)
-    fig3 = go.Figure(go.Bar(
-        y=top_roi_items["Item Name"],
-        x=top_roi_items["ROI (%)"],
-        orientation='h',
-        hovertemplate="<b>%{y}</b><br>ROI: %{x:.2%}<extra></extra>"
-    ))
-    fig3.update_layout(
-        title_text="Top 10 Items by ROI (%)",
-        yaxis=dict(autorange="reversed"),
-        xaxis_title="ROI (%)",
-        xaxis=dict(tickformat=".0%"),
-        height=450
-    )
-
-    # Combine charts into a single HTML file with a grid layout
-    report_html_path = os.path.join(output_dir, "interactive_report.html")
-    with open(report_html_path, 'w') as f:
-        f.write("""
-        <html>
-        <head>
-            <title>Interactive Report</title>
-            <style>
-                body { background-color: #1a1a1a; color: #f0f0f0; font-family: sans-serif; }
-                h1 { text-align: center; }
-                .grid-container {
-                    display: grid;
-                    grid-template-columns: 1fr 1fr;
-                    gap: 20px;
-                    padding: 20px;
-                }
-                .grid-item {
-                    background-color: #2a2a2a;
-                    border-radius: 8px;
-                    padding: 15px;
-                }
-                .grid-item-span-2 {
-                    grid-column: span 2;
-                }
-            </style>
-        </head>
-        <body>
-            <h1>Transaction Analysis Report</h1>
-            <div class="grid-container">
-        """)
-
-        # Embed charts into grid items
-        f.write(f'<div class="grid-item grid-item-span-2">{fig1.to_html(full_html=False, include_plotlyjs="cdn")}</div>')
-        f.write(f'<div class="grid-item">{fig2.to_html(full_html=False, include_plotlyjs=False)}</div>')
-        f.write(f'<div class="grid-item">{fig3.to_html(full_html=False, include_plotlyjs=False)}</div>')
-
-        f.write("""
-            </div>
-        </body>
-        </html>
-        """)
-
+    with metrics.stage("report/html"):
+        report_html_path = build_report(df, daily, output_dir, profit_col, roi_col, inline=inline_plotly)
     status_callback(f"Interactive report saved to {report_html_path}")
 
-def run_transaction_scraper(api_key: str, output_dir: str, status_callback=None, days: int = 30):
+@metrics.timed_run("transactions")
+def run_transaction_scraper(api_key: str, output_dir: str, status_callback=None, days: int = 30, engine: str = "async",
+                            item_cache: bool = True, use_ledger: bool = True, cancel_token=None, metrics_path=None):
     if status_callback is None:
         status_callback = print
 
+    def cancelled():
+        # Checked between stages; a cancelled run writes no report
+        if cancel_token is not None and cancel_token.cancelled:
+            status_callback("Cancelled. Nothing was saved.")
+            return True
+        return False
+
     if not api_key:
         status_callback("Error: API Key is missing.")
         return
 
     os.makedirs(output_dir, exist_ok=True)
 
-    buys, sells = fetch_transactions(api_key, status_callback)
-    buys = filter_last_n_days(buys, status_callback, n=days)
-    sells = filter_last_n_days(sells, status_callback, n=days)
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    with metrics.stage("transactions/fetch"):
+        if use_ledger:
+            ledger = TransactionLedger(ledger_path(output_dir, api_key))
+            try:
+                buys, sells = sync_ledger(ledger, api_key, status_callback, since=since, engine=engine)
+            finally:
+                ledger.close()
+        elif engine == "async":
+            buys, sells = asyncio.run(fetch_transactions_async(api_key, status_callback))
+        else:
+            buys, sells = fetch_transactions(api_key, status_callback)
+    if cancelled():
+        return
+    all_buys, all_sells = buys, sells
+    metrics.add("rows/transactions", len(buys) + len(sells))
+    with metrics.stage("transactions/filter"):
+        buys = filter_last_n_days_df(buys, status_callback, n=days)
+        sells = filter_last_n_days_df(sells, status_callback, n=days)
 
-    if not buys:
+    if buys.empty:
         status_callback(f"No buy transactions found in the last {days} days.")
         return
 
-    all_ids = [tx["item_id"] for tx in buys + sells]
+    status_callback("Matching sells to buys (FIFO)...")
+    with metrics.stage("transactions/match"):
+        lots, daily = match_lots(all_buys, all_sells, since=since)
+
+    all_ids = pd.concat([buys["item_id"], sells["item_id"]]).astype(int).tolist() + list(lots)
     status_callback("Fetching item names...")
-    item_names = get_item_names(all_ids, status_callback)
+    catalog = ItemCatalog(os.path.join(output_dir, "item-catalog.sqlite")) if item_cache else None
+    try:
+        with metrics.stage("transactions/items"):
+            if engine == "async":
+                item_names = asyncio.run(get_item_names_async(all_ids, status_callback, catalog))
+            else:
+                item_names = get_item_names(all_ids, status_callback, catalog)
+    finally:
+        if catalog is not None:
+            catalog.close()
+
+    if cancelled():
+        return
 
     status_callback("Aggregating transactions...")
-    agg = aggregate_transactions(buys, sells)
+    with metrics.stage("transactions/aggregate"):
+        agg = aggregate_transactions_df(buys, sells)
 
-    save_profit_report(agg, item_names, output_dir, status_callback)
+    save_profit_report(agg, item_names, output_dir, status_callback, lots=lots, daily=daily)
     status_callback("Transaction report complete.")
 
 
@@ -261,4 +469,4 @@ if __name__ == "__main__":
     api_key = os.environ.get("GW2_API_KEY")
     output_dir = "."
 
-    run_transaction_scraper(api_key=api_key, output_dir=output_dir)
+    run_transaction_scraper(api_key=api_key, output_dir=output_dir, metrics_path=os.environ.get("GW2_METRICS_OUT"))